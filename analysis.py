@@ -0,0 +1,97 @@
+"""SAT competition style scoring: PAR-2, cactus plots and the virtual best
+solver (VBS).
+
+A solver solves a problem if its answer (SAT or UNSAT) was verified as
+correct; timeouts, errors and wrong answers all count as unsolved. All
+functions work on the per-(problem, solver) summary from
+stats.summarize_trials and use the median wall time.
+"""
+import numpy as np
+import pandas as pd
+
+PAR_FACTOR = 2
+VBS = "virtual best"
+
+
+def solved_mask(summary):
+    return summary["status"].isin(["SAT", "UNSAT"]) & summary["correct"]
+
+
+def penalized_times(summary, timeout, factor=PAR_FACTOR):
+    """Problem x solver table of wall times, with unsolved runs counted as
+    factor * timeout."""
+    times = summary["wall_sec_median"].where(solved_mask(summary),
+                                             factor * timeout)
+    return summary.assign(score=times).pivot(
+        index="problem", columns="solver", values="score")
+
+
+def par_scores(summary, timeout, factor=PAR_FACTOR):
+    """Per solver: solved problems, PAR-2 score and marginal contribution.
+
+    The PAR-2 score is the mean penalized wall time over all problems. The
+    virtual best solver takes the fastest solver on every problem. A
+    solver's marginal contribution is how much the VBS's summed penalized
+    time grows if that solver is left out, and `unique_solved` counts the
+    problems no other solver solved.
+    """
+    times = penalized_times(summary, timeout, factor)
+    # Pairs that were never run (e.g. after filtering) count as unsolved
+    times = times.fillna(factor * timeout)
+    solved = times < factor * timeout
+    vbs = times.min(axis=1)
+
+    rows = []
+    for solver in times.columns:
+        others = times.drop(columns=solver)
+        without = others.min(axis=1) if not others.empty else \
+            pd.Series(factor * timeout, index=times.index)
+        rows.append({
+            "solver": solver,
+            "solved": int(solved[solver].sum()),
+            "unique_solved": int((solved[solver] & ~solved.drop(
+                columns=solver).any(axis=1)).sum()),
+            f"par{factor}": times[solver].mean(),
+            "marginal_contribution_sec": without.sum() - vbs.sum(),
+        })
+    rows.append({
+        "solver": VBS,
+        "solved": int(solved.any(axis=1).sum()),
+        "unique_solved": 0,
+        f"par{factor}": vbs.mean(),
+        "marginal_contribution_sec": 0.0,
+    })
+    scores = pd.DataFrame(rows).sort_values(
+        ["solved", f"par{factor}"], ascending=[False, True])
+    return scores.reset_index(drop=True)
+
+
+def cactus_data(summary, timeout):
+    """Long table (solver, solved, wall_sec) with the n-th fastest solved
+    problem per solver, including the virtual best solver."""
+    times = penalized_times(summary, timeout)
+    times[VBS] = times.min(axis=1)
+    frames = []
+    for solver in times.columns:
+        solved = np.sort(
+            times[solver][times[solver] < PAR_FACTOR * timeout].to_numpy())
+        frames.append(pd.DataFrame({
+            "solver": solver,
+            "solved": np.arange(1, len(solved) + 1),
+            "wall_sec": solved,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_cactus(summary, timeout, ax):
+    """Cactus plot: the time needed for the n-th fastest solved problem over
+    n. Lines further to the right solve more problems, lines further down
+    solve them faster."""
+    data = cactus_data(summary, timeout)
+    for solver, points in data.groupby("solver", sort=False):
+        style = dict(color="black", linestyle="--", linewidth=2) \
+            if solver == VBS else dict(marker="o", markersize=3)
+        ax.plot(points["solved"], points["wall_sec"], label=solver, **style)
+    ax.set_yscale("log")
+    ax.axhline(y=timeout, color="r", linestyle="--", label="Timeout")
+    return ax
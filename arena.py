@@ -0,0 +1,143 @@
+"""Solver discovery, invocation and answer checking.
+
+Kept free of the runner's heavy dependencies (pandas, matplotlib, pysat),
+so that tools like race.py can start solvers within milliseconds. The
+runner re-exports everything defined here.
+"""
+import os
+import sys
+
+SOLVERS_DIR = "/app/solvers"
+TIMEOUT_SECONDS = 30
+
+
+def solver_variants():
+    """Reads the solver variants from solvers/.variants.
+
+    Each line defines a variant as a name, a solver file and the extra
+    arguments the file is started with, e.g.
+
+        t1_vsids t1_david_mutas_dpll.py --cdcl --heuristic vsids
+
+    Variants are benchmarked like separate solvers. Lines starting with
+    '#' are comments.
+    """
+    variants = {}
+    variants_path = os.path.join(SOLVERS_DIR, ".variants")
+    if os.path.exists(variants_path):
+        with open(variants_path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and not parts[0].startswith("#"):
+                    variants[parts[0]] = (parts[1], parts[2:])
+    return variants
+
+
+def list_solvers():
+    """All solver files in SOLVERS_DIR plus the variants defined on them."""
+    # Skips directories such as __pycache__, which appears as soon as a
+    # solver module is imported
+    solvers = [f for f in os.listdir(SOLVERS_DIR) if not f.startswith('.')
+               and os.path.isfile(os.path.join(SOLVERS_DIR, f))]
+    return solvers + [name for name in solver_variants() if name not in solvers]
+
+
+def resolve_solver(solver_name):
+    """Returns the file name and extra arguments of a solver or variant."""
+    return solver_variants().get(solver_name, (solver_name, []))
+
+
+def solver_argv(solver_name):
+    """Builds the argument vector that starts a solver."""
+    solver_name, args = resolve_solver(solver_name)
+    solver_path = os.path.join(SOLVERS_DIR, solver_name)
+
+    if solver_name.endswith(".py"):
+        return ["python3", solver_path] + args
+    elif solver_name.endswith(".ex") or solver_name.endswith(".exs"):
+        return ["elixir", solver_path] + args
+
+    try:
+        os.chmod(solver_path, 0o755)
+    except OSError:
+        pass
+    return [solver_path] + args
+
+
+def available_cores():
+    """Returns the CPU cores this process is allowed to run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def pin_to_core(core):
+    """Returns a preexec_fn for subprocess.Popen that pins the child to a
+    core before it starts the solver, or None if core is None.
+
+    Like the measurement launcher, this sets the affinity in the child
+    instead of starting the solver through taskset.
+    """
+    if core is None:
+        return None
+    return lambda: os.sched_setaffinity(0, {core})
+
+
+def parse_output(stdout_str, exit_code, timed_out):
+    """Parses status (SAT/UNSAT) and model (assignments)."""
+    status = "ERROR"
+
+    if timed_out:
+        status = "TIMEOUT"
+    elif exit_code not in {0, 10, 20}:
+        # On stderr, so it does not mix with DIMACS output on stdout
+        print(f"Warning: Solver exited with code {exit_code}",
+              file=sys.stderr, flush=True)
+
+    if "s SATISFIABLE" in stdout_str:
+        status = "SAT"
+    elif "s UNSATISFIABLE" in stdout_str:
+        status = "UNSAT"
+
+    model = None
+    for line in stdout_str.splitlines():
+        if line.startswith("v "):
+            model = []
+            parts = line[2:].strip().split()
+            for p in parts:
+                if p != '0':
+                    model.append(int(p))
+            break
+
+    return status, model
+
+
+def check_model(formula, status, model):
+    """Checks the model of a SAT answer, or the countermodel of an UNSAT
+    answer, against the formula. Returns (correct, note)."""
+    if status == "SAT":
+        if model is None:
+            return True, "SAT (no model given)"
+
+        falsified = formula.falsified_clauses(model)
+        if len(falsified) > 0:
+            clause = formula.clause(falsified[0])
+            return False, f"Invalid Model (Clause {clause} failed)"
+
+        return True, "SAT (given model verified)"
+
+    if status == "UNSAT":
+        if model is None:
+            return True, "UNSAT (no countermodel given)"
+
+        countersat = len(formula.falsified_clauses(model)) > 0
+        if formula.num_clauses == 0 and len(model) == 0:
+            countersat = True
+
+        if countersat:
+            return True, "UNSAT (given countermodel verified)"
+        else:
+            return True, "Invalid Countermodel"
+
+    return False, "Solver Error"
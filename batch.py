@@ -0,0 +1,288 @@
+"""Batch solving: streams many problems through long-lived solver workers.
+
+Solvers that support the worker protocol are started once with
+ARENA_WORKER=1 and then receive problems as frames on stdin, answering
+with frames on stdout. A frame is the payload's length in bytes as a
+decimal number, a newline, and the payload:
+
+    <length>\\n<DIMACS problem>    ->    <length>\\n<solver output>
+
+A solver supports the protocol if its file contains the string
+ARENA_WORKER. A worker that exceeds the per-problem timeout is killed and
+restarted; a worker whose memory grows beyond --max-rss-mb is recycled
+after its answer. For comparison, every problem is also run cold, one
+process per problem as in the benchmark.
+
+    python batch.py problems/*.cnf [--solvers cadical.py m22.py] [-j 4]
+"""
+import argparse
+import os
+import queue
+import select
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import runner
+from dimacs import Formula, open_instance
+from measure import run_measured
+
+RESULTS_FILE = os.path.join(runner.RESULTS_DIR, "batch_throughput.csv")
+MAX_RSS_MB = 1024
+
+
+def supports_worker(solver_name):
+    file_name, _ = runner.resolve_solver(solver_name)
+    with open(os.path.join(runner.SOLVERS_DIR, file_name), "rb") as f:
+        return b"ARENA_WORKER" in f.read()
+
+
+def rss_kb(pid):
+    """Current resident set size of a process, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class WorkerError(Exception):
+    pass
+
+
+class Worker:
+    """One persistent solver process speaking the frame protocol."""
+
+    def __init__(self, solver_name, core=None):
+        self.argv = runner.solver_argv(solver_name)
+        self.core = core
+        self.proc = None
+        self.restarts = -1
+        self._buffer = b""
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, start_new_session=True,
+            preexec_fn=runner.pin_to_core(self.core),
+            env={**os.environ, "ARENA_WORKER": "1"})
+        self.restarts += 1
+        self._buffer = b""
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.proc.wait()
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.proc.stdout.close()
+        self.proc = None
+
+    def _read_until(self, size, deadline):
+        fd = self.proc.stdout.fileno()
+        while len(self._buffer) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                raise WorkerError(f"worker exited with code {self.proc.wait()}")
+            self._buffer += chunk
+
+    def _read_frame(self, deadline):
+        while b"\n" not in self._buffer:
+            self._read_until(len(self._buffer) + 1, deadline)
+        header, self._buffer = self._buffer.split(b"\n", 1)
+        size = int(header)
+        self._read_until(size, deadline)
+        payload, self._buffer = self._buffer[:size], self._buffer[size:]
+        return payload
+
+    def solve(self, data, timeout):
+        """Sends one problem and returns the solver's output.
+
+        Raises TimeoutError or WorkerError; the worker is stopped then and
+        started again on the next call.
+        """
+        if self.proc is None:
+            self.start()
+        try:
+            self.proc.stdin.write(b"%d\n" % len(data) + data)
+            self.proc.stdin.flush()
+            return self._read_frame(time.monotonic() + timeout).decode(
+                errors="replace")
+        except (TimeoutError, WorkerError, BrokenPipeError, ValueError):
+            self.stop()
+            raise
+
+
+def run_warm(solver_name, problems, jobs, timeout, max_rss_kb):
+    """Streams all problems through `jobs` workers of a solver.
+
+    Returns the outputs (status, model) per problem, the elapsed wall time
+    and the number of worker restarts after timeouts, errors or memory
+    growth.
+    """
+    workers = queue.SimpleQueue()
+    for core in runner.available_cores()[:jobs]:
+        workers.put(Worker(solver_name, core))
+
+    def solve(problem):
+        _, data = problem
+        worker = workers.get()
+        try:
+            stdout = worker.solve(data, timeout)
+            status, model = runner.parse_output(stdout, 0, False)
+            if rss_kb(worker.proc.pid) > max_rss_kb:
+                worker.stop()
+            return status, model
+        except TimeoutError:
+            return "TIMEOUT", None
+        except (WorkerError, BrokenPipeError, ValueError):
+            return "ERROR", None
+        finally:
+            workers.put(worker)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        answers = list(executor.map(solve, problems))
+    elapsed = time.monotonic() - start
+
+    restarts = 0
+    for _ in range(jobs):
+        worker = workers.get()
+        worker.stop()
+        restarts += max(worker.restarts, 0)
+    return answers, elapsed, restarts
+
+
+def run_cold(solver_name, paths, jobs, timeout):
+    """Runs one fresh solver process per problem, `jobs` at a time."""
+    cores = queue.SimpleQueue()
+    for core in runner.available_cores()[:jobs]:
+        cores.put(core)
+
+    def solve(path):
+        core = cores.get()
+        argv = runner.solver_argv(solver_name)
+        try:
+            res = run_measured(argv, path, timeout, core=core)
+            return runner.parse_output(
+                res["stdout"], res["exit_code"], res["timed_out"])
+        except (RuntimeError, ValueError):
+            return "ERROR", None
+        finally:
+            cores.put(core)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        answers = list(executor.map(solve, paths))
+    return answers, time.monotonic() - start
+
+
+def count_solved(answers, formulas, expected):
+    """Number of answers verify_correctness accepts."""
+    return sum(runner.verify_correctness(formula, status, model, exp)[0]
+               for (status, model), formula, exp
+               in zip(answers, formulas, expected))
+
+
+def run_batch(paths, solvers, jobs=1, timeout=runner.TIMEOUT_SECONDS,
+              max_rss_mb=MAX_RSS_MB, cold=True):
+    cores = runner.available_cores()
+    if jobs <= 0 or jobs > len(cores):
+        jobs = len(cores)
+
+    print(f"Loading {len(paths)} problems...", end=" ", flush=True)
+    problems = []
+    formulas = []
+    for path in paths:
+        with open_instance(path) as f:
+            data = f.read()
+        try:
+            formulas.append(Formula.from_bytes(data))
+        except ValueError as e:
+            print(f"\nSkipping {path}: {e}", end=" ", flush=True)
+            continue
+        problems.append((path, data))
+    paths = [path for path, _ in problems]
+    reference_cache = runner.load_reference_cache()
+    expected = [runner.reference_result(reference_cache, os.path.basename(path),
+                                        runner.file_hash(path), formula)[0]
+                for path, formula in zip(paths, formulas)]
+    runner.save_reference_cache(reference_cache)
+    print("done", flush=True)
+
+    rows = []
+    for solver_name in solvers:
+        row = {"solver": solver_name, "problems": len(paths), "jobs": jobs}
+        if supports_worker(solver_name):
+            answers, elapsed, restarts = run_warm(
+                solver_name, problems, jobs, timeout, max_rss_mb * 1024)
+            row.update({
+                "warm_solved": count_solved(answers, formulas, expected),
+                "warm_sec": round(elapsed, 3),
+                "warm_per_sec": round(len(paths) / elapsed, 2),
+                "worker_restarts": restarts,
+            })
+        if cold:
+            answers, elapsed = run_cold(solver_name, paths, jobs, timeout)
+            row.update({
+                "cold_solved": count_solved(answers, formulas, expected),
+                "cold_sec": round(elapsed, 3),
+                "cold_per_sec": round(len(paths) / elapsed, 2),
+            })
+        if "warm_sec" in row and "cold_sec" in row:
+            row["speedup"] = round(row["cold_sec"] / row["warm_sec"], 2)
+        print(f"{solver_name}: " + ", ".join(
+            f"{k}={v}" for k, v in row.items() if k != "solver"), flush=True)
+        rows.append(row)
+
+    df = pd.DataFrame(rows).convert_dtypes()
+    print("\n--- Throughput (problems per second) ---")
+    print(df.set_index("solver").to_string())
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solves many problems with persistent solver workers and "
+                    "compares warm with cold-start throughput.")
+    parser.add_argument("problems", nargs="+", help="DIMACS CNF files")
+    parser.add_argument(
+        "--solvers", nargs="+", metavar="SOLVER",
+        help="solvers to run (default: all in the solvers directory)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="workers per solver, each pinned to its own CPU core "
+             "(0 = one per available core, default: 1)")
+    parser.add_argument(
+        "--timeout", type=float, default=runner.TIMEOUT_SECONDS,
+        help=f"seconds per problem (default: {runner.TIMEOUT_SECONDS})")
+    parser.add_argument(
+        "--max-rss-mb", type=int, default=MAX_RSS_MB,
+        help=f"recycle a worker once its memory exceeds this many MB "
+             f"(default: {MAX_RSS_MB})")
+    parser.add_argument(
+        "--no-cold", action="store_true",
+        help="skip the cold-start comparison")
+    args = parser.parse_args()
+
+    solvers = args.solvers or runner.list_solvers()
+    df = run_batch(args.problems, solvers, args.jobs, args.timeout,
+                   args.max_rss_mb, cold=not args.no_cold)
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    df.to_csv(RESULTS_FILE, index=False)
+    print(f"\nSaved to {RESULTS_FILE}")
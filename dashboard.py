@@ -2,9 +2,17 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import os
+import re
+import sqlite3
+
+from analysis import PAR_FACTOR, cactus_data, par_scores, solved_mask
+from stats import flag_ties, summarize_trials
 
 # --- Configuration ---
 RESULTS_FILE = "/app/results/benchmark_data.csv"
+DB_FILE = "/app/results/benchmark.db"
+# Timeout of results written before the timeout was recorded per result
+DEFAULT_TIMEOUT_SECONDS = 30
 
 st.set_page_config(page_title="SAT Benchmark Results", layout="wide")
 
@@ -15,8 +23,164 @@ if not os.path.exists(RESULTS_FILE):
         f"Results file not found at {RESULTS_FILE}. Please run your benchmark script first.")
     st.stop()
 
-# Load Data
-df = pd.read_csv(RESULTS_FILE)
+
+def problem_family(problem):
+    """Groups problems by name: "uf50-011.cnf" -> "uf50", "bw_huge.cnf" ->
+    "bw", "Gen_PHP_5_4" -> "Gen_PHP"."""
+    parts = re.split(r"[_\-.]", problem)
+    if parts[0] == "Gen" and len(parts) > 1:
+        return f"Gen_{parts[1]}"
+    return parts[0]
+
+
+# --- Cached data loading ---
+# The loaders are keyed by the file's path and modification time, so the
+# data is read and aggregated once per benchmark run instead of on every
+# rerun of the page.
+
+@st.cache_data(max_entries=4, show_spinner="Loading results...")
+def load_results(path, mtime):
+    if path == DB_FILE:
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as db:
+            df = pd.read_sql_query("SELECT * FROM results ORDER BY id", db)
+        df["correct"] = df["correct"].astype(bool)
+    else:
+        df = pd.read_csv(path)
+    df["family"] = df["problem"].map(problem_family)
+    return df
+
+
+@st.cache_data(max_entries=4, show_spinner="Aggregating results...")
+def load_summary(path, mtime):
+    """One row per (problem, solver) with median and confidence interval per
+    metric, over all trials in the file."""
+    summary = summarize_trials(load_results(path, mtime))
+    summary["family"] = summary["problem"].map(problem_family)
+    return summary
+
+
+def per_solver(df):
+    aggregates = dict(
+        runs=("problem", "size"),
+        problems=("problem", "nunique"),
+        correct=("correct", "sum"),
+        timeouts=("status", lambda s: (s == "TIMEOUT").sum()),
+        memouts=("status", lambda s: (s == "MEMOUT").sum()),
+        errors=("status", lambda s: (s == "ERROR").sum()),
+        wall_sec_total=("wall_sec", "sum"),
+        wall_sec_median=("wall_sec", "median"),
+        memory_kb_max=("memory_kb", "max"),
+    )
+    # Results recorded before the delivery or proof checking time was
+    # measured lack them
+    if "delivery_sec" in df:
+        aggregates["delivery_sec_total"] = ("delivery_sec", "sum")
+    if "check_sec" in df:
+        aggregates["check_sec_total"] = ("check_sec", "sum")
+    return df.groupby("solver").agg(**aggregates).reset_index()
+
+
+def search_rates(df):
+    """Per run: every search statistic a solver reported (stat_* columns)
+    divided by the wall time, e.g. stat_propagations -> propagations_per_sec.
+    Runs without statistics are left out."""
+    stats = [c for c in df.columns if c.startswith("stat_")]
+    runs = df.dropna(subset=stats, how="all") if stats else df.iloc[:0]
+    rates = runs[["family", "problem", "solver"]].copy()
+    for column in stats:
+        rates[f"{column[len('stat_'):]}_per_sec"] = \
+            runs[column] / runs["wall_sec"]
+    return rates
+
+
+@st.cache_data(max_entries=16, show_spinner="Loading samples...")
+def load_samples(path, mtime, solver, problem):
+    """CPU and RSS samples of the latest benchmark run that sampled the
+    solver on the problem, one series per trial."""
+    with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as db:
+        return pd.read_sql_query(
+            "SELECT results.trial, results.status, samples.t_sec, "
+            "samples.cpu_sec, samples.rss_kb "
+            "FROM samples JOIN results ON results.id = samples.result_id "
+            "WHERE results.solver = ? AND results.problem = ? "
+            "AND results.run_id = (SELECT MAX(run_id) FROM results "
+            "  WHERE solver = ? AND problem = ? "
+            "  AND id IN (SELECT result_id FROM samples)) "
+            "ORDER BY results.trial, samples.t_sec",
+            db, params=(solver, problem, solver, problem))
+
+
+def per_problem(summary):
+    # Only solvers that solved a problem can be its fastest
+    solved = summary[solved_mask(summary)]
+    fastest = solved.loc[solved.groupby("problem")["wall_sec_median"].idxmin()]
+    return summary.groupby(["family", "problem"]).agg(
+        solvers=("solver", "size"),
+        correct=("correct", "sum"),
+        status=("status", lambda s: s.mode().iloc[0]),
+    ).reset_index().merge(
+        fastest[["problem", "solver", "wall_sec_median"]].rename(
+            columns={"solver": "fastest_solver"}),
+        on="problem", how="left")
+
+
+# --- Filters ---
+st.sidebar.header("Filters")
+source = RESULTS_FILE
+if os.path.exists(DB_FILE) and st.sidebar.toggle(
+        "All past runs", value=False,
+        help="Show every result in the result database instead of only the "
+             "latest benchmark run."):
+    source = DB_FILE
+mtime = os.path.getmtime(source)
+all_data = load_results(source, mtime)
+all_summary = load_summary(source, mtime)
+
+solvers = st.sidebar.multiselect(
+    "Solver", sorted(all_data["solver"].unique()), placeholder="All solvers")
+families = st.sidebar.multiselect(
+    "Problem family", sorted(all_data["family"].unique()),
+    placeholder="All families")
+statuses = st.sidebar.multiselect(
+    "Status", sorted(all_data["status"].unique()), placeholder="All statuses")
+
+
+def apply_filters(frame):
+    """Restricts a frame to the selected solvers, families and statuses; an
+    empty selection keeps everything."""
+    mask = pd.Series(True, index=frame.index)
+    for column, selected in (("solver", solvers), ("family", families),
+                             ("status", statuses)):
+        if selected:
+            mask &= frame[column].isin(selected)
+    return frame[mask]
+
+
+df = apply_filters(all_data)
+summary = apply_filters(all_summary).reset_index(drop=True).copy()
+if df.empty:
+    st.warning("No results match the selected filters.")
+    st.stop()
+# Ties are relative to the fastest of the solvers that are shown
+summary = flag_ties(summary)
+
+
+def ci_bar(metric, log_y, hover_metric):
+    """Grouped bar chart of a metric's median with CI error bars."""
+    return px.bar(
+        summary,
+        x="problem",
+        y=f"{metric}_median",
+        color="solver",
+        barmode="group",
+        log_y=log_y,
+        error_y=summary[f"{metric}_ci_high"] - summary[f"{metric}_median"],
+        error_y_minus=summary[f"{metric}_median"] - summary[f"{metric}_ci_low"],
+        hover_data=["status", "trials", f"{metric}_iqr", f"{hover_metric}_median",
+                    "wall_sec_tied"],
+        labels={f"{metric}_median": metric},
+        title="Solver Comparison by Problem (median, error bars: 95% CI)"
+    )
 
 # --- Top Level Metrics ---
 col1, col2, col3 = st.columns(3)
@@ -24,6 +188,13 @@ col1.metric("Total Problems", df['problem'].nunique())
 col2.metric("Solvers Tested", df['solver'].nunique())
 col3.metric("Total Time", f"{df['wall_sec'].sum():.2f}s")
 
+# --- Aggregates ---
+st.subheader("Per Solver")
+st.dataframe(per_solver(df), width='stretch', hide_index=True)
+
+st.subheader("Per Problem")
+st.dataframe(per_problem(summary), width='stretch', hide_index=True)
+
 # --- Interactive Data Table ---
 st.subheader("Detailed Data")
 
@@ -42,24 +213,16 @@ st.dataframe(
 # --- Interactive Charts ---
 st.subheader("Performance Analysis")
 
-tab1, tab2, tab3, tab4 = st.tabs(
-    ["Wall Time", "CPU Time", "Memory Usage", "Correctness"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(
+    ["Wall Time", "CPU Time", "Memory Usage", "Correctness", "Significance",
+     "Scores", "Search", "Timeline"])
 
 with tab1:
     st.markdown("### Execution Time (Seconds)")
     # Pivot data for the chart: Index=Problem, Columns=Solver, Values=Metric
     use_log1 = st.checkbox("Use Log Scale", value=False, key="log_time")
 
-    fig = px.bar(
-        df,
-        x="problem",
-        y="wall_sec",
-        color="solver",
-        barmode="group",
-        log_y=use_log1,
-        hover_data=["status", "memory_kb"],
-        title="Solver Comparison by Problem"
-    )
+    fig = ci_bar("wall_sec", use_log1, "memory_kb")
 
     st.plotly_chart(fig, width='stretch')
 
@@ -68,16 +231,7 @@ with tab2:
     # Pivot data for the chart: Index=Problem, Columns=Solver, Values=Metric
     use_log2 = st.checkbox("Use Log Scale", value=False, key="log_cpu")
 
-    fig = px.bar(
-        df,
-        x="problem",
-        y="cpu_sec",
-        color="solver",
-        barmode="group",
-        log_y=use_log2,
-        hover_data=["status", "memory_kb"],
-        title="Solver Comparison by Problem"
-    )
+    fig = ci_bar("cpu_sec", use_log2, "memory_kb")
 
     st.plotly_chart(fig, width='stretch')
 
@@ -86,20 +240,12 @@ with tab3:
 
     use_log3 = st.checkbox("Use Log Scale", value=False, key="log_mem")
 
-    fig = px.bar(
-        df,
-        x="problem",
-        y="memory_kb",
-        color="solver",
-        barmode="group",
-        log_y=use_log3,
-        hover_data=["status", "wall_sec"],
-        title="Solver Comparison by Problem"
-    )
+    fig = ci_bar("memory_kb", use_log3, "wall_sec")
 
     st.plotly_chart(fig, width='stretch')
 
-    mem_data = df.pivot(index='problem', columns='solver', values='memory_kb')
+    mem_data = summary.pivot(
+        index='problem', columns='solver', values='memory_kb_median')
     st.bar_chart(mem_data)
 
 with tab4:
@@ -108,3 +254,117 @@ with tab4:
         df[["problem", "solver", "correct", "note"]],
         width='stretch',
     )
+
+with tab5:
+    st.markdown("### Not Significantly Slower Than the Fastest Solver")
+    st.caption(
+        "Per problem, solvers whose 95% confidence interval of the median "
+        "wall time overlaps the fastest solver's interval. Differences "
+        "between these solvers are within run-to-run noise.")
+    if summary["trials"].max() < 2:
+        st.info("Run the benchmark with --repeat K (K > 1) to get "
+                "meaningful confidence intervals.")
+    ties = summary[summary["wall_sec_tied"]]
+    st.dataframe(
+        ties.groupby("problem")["solver"].apply(", ".join).rename(
+            "tied solvers").reset_index(),
+        width='stretch',
+    )
+
+with tab6:
+    timeout = df["timeout_sec"].max() if "timeout_sec" in df \
+        else DEFAULT_TIMEOUT_SECONDS
+    st.markdown(f"### PAR-{PAR_FACTOR} Scores")
+    st.caption(
+        f"Mean wall time over all problems, with unsolved problems (timeouts, "
+        f"errors, wrong answers) counted as {PAR_FACTOR} × {timeout:g}s. The "
+        f"virtual best solver takes the fastest solver on every problem; a "
+        f"solver's marginal contribution is how many seconds the virtual "
+        f"best solver loses without it.")
+    st.dataframe(par_scores(summary, timeout), width='stretch',
+                 hide_index=True)
+
+    st.markdown("### Cactus Plot")
+    fig = px.line(
+        cactus_data(summary, timeout),
+        x="solved",
+        y="wall_sec",
+        color="solver",
+        markers=True,
+        log_y=True,
+        labels={"solved": "problems solved", "wall_sec": "wall time (s)"},
+        title="Time for the n-th Fastest Solved Problem"
+    )
+    fig.add_hline(y=timeout, line_dash="dash", line_color="red",
+                  annotation_text="Timeout")
+    st.plotly_chart(fig, width='stretch')
+
+with tab7:
+    st.markdown("### Search Throughput")
+    rates = search_rates(df)
+    metrics = [c for c in rates.columns if c.endswith("_per_sec")]
+    if rates.empty:
+        st.info("No solver reported search statistics. Solvers report them "
+                "as `c stat <name> <value>` lines, e.g. "
+                "`c stat decisions 12345`.")
+    else:
+        st.caption(
+            "Counters reported by the solvers (`c stat <name> <value>`) per "
+            "second of wall time, median over all runs. The wall time "
+            "includes the solver's startup, so rates on easy problems are "
+            "low for every solver.")
+        st.dataframe(
+            rates.groupby("solver")[metrics].median().reset_index(),
+            width='stretch', hide_index=True)
+
+        metric = st.selectbox(
+            "Metric", metrics,
+            index=metrics.index("propagations_per_sec")
+            if "propagations_per_sec" in metrics else 0)
+        use_log7 = st.checkbox("Use Log Scale", value=True, key="log_search")
+        fig = px.bar(
+            rates.groupby(["problem", "solver"])[metric].median().reset_index(),
+            x="problem",
+            y=metric,
+            color="solver",
+            barmode="group",
+            log_y=use_log7,
+            title="Search Throughput by Problem (median)"
+        )
+        st.plotly_chart(fig, width='stretch')
+
+with tab8:
+    st.markdown("### CPU and Memory over Time")
+    if not os.path.exists(DB_FILE):
+        st.info(f"Resource samples are stored in {DB_FILE}, which does not "
+                f"exist yet.")
+    else:
+        col1, col2 = st.columns(2)
+        timeline_solver = col1.selectbox(
+            "Solver", sorted(df["solver"].unique()), key="timeline_solver")
+        timeline_problem = col2.selectbox(
+            "Problem", sorted(df[df["solver"] == timeline_solver]
+                              ["problem"].unique()), key="timeline_problem")
+        samples = load_samples(DB_FILE, os.path.getmtime(DB_FILE),
+                               timeline_solver, timeline_problem)
+        if samples.empty:
+            st.info("No samples for this run. Runs shorter than the sampling "
+                    "interval (runner.py --sample-interval) have none.")
+        else:
+            st.caption(
+                "CPU time (user + system) and resident memory of the solver "
+                "process, sampled at fixed intervals, per trial of the "
+                "latest benchmark run that sampled this pair.")
+            samples["series"] = "trial " + samples["trial"].astype(str) + \
+                " (" + samples["status"] + ")"
+            for metric, label in (("rss_kb", "RSS (KB)"),
+                                  ("cpu_sec", "CPU time (s)")):
+                fig = px.line(
+                    samples,
+                    x="t_sec",
+                    y=metric,
+                    color="series",
+                    markers=True,
+                    labels={"t_sec": "wall time (s)", metric: label},
+                )
+                st.plotly_chart(fig, width='stretch')
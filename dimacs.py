@@ -0,0 +1,303 @@
+"""Shared handling of DIMACS CNF input for the runner and its tools.
+
+Run `python dimacs.py FILE...` for a parsing throughput benchmark.
+"""
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import re
+import time
+import warnings
+
+import numpy as np
+
+# Compressed instances are recognized by their file name suffix
+DECOMPRESSORS = {".gz": gzip.open, ".xz": lzma.open, ".bz2": bz2.open}
+CNF_SUFFIXES = (".cnf",) + tuple(".cnf" + suffix for suffix in DECOMPRESSORS)
+
+# Comment and problem lines, removed before the bulk conversion
+SKIPPED_LINES = re.compile(rb"^[ \t]*[cp].*$", re.MULTILINE)
+PROBLEM_LINE = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)", re.MULTILINE)
+# A SATLIB-style `%` line ends the formula
+END_MARKER = re.compile(rb"^[ \t]*%", re.MULTILINE)
+
+
+def is_compressed(path):
+    return os.path.splitext(path)[1] in DECOMPRESSORS
+
+
+def open_instance(path, mode="rb"):
+    """Opens a plain, gzip, xz or bzip2 compressed instance. Compressed
+    files are decompressed while they are read."""
+    opener = DECOMPRESSORS.get(os.path.splitext(path)[1], open)
+    return opener(path, mode)
+
+
+class DimacsError(ValueError):
+    """Raised when an input is not a valid DIMACS CNF encoding."""
+
+    def __init__(self, line_no, message):
+        super().__init__(f"line {line_no}: {message}")
+        self.line_no = line_no
+        self.message = message
+
+
+def check_dimacs(lines):
+    """Validates a DIMACS CNF encoding in a single pass over its lines.
+
+    Checks that the problem line comes before the first clause, that every
+    literal is an integer within the declared variable range, that the
+    number of clauses matches the header and that every declared variable
+    occurs. Clauses may span several lines, a missing 0 after the last
+    clause is tolerated and a SATLIB-style `%` line ends the input.
+    Memory use is one byte per declared variable, independent of the
+    number of clauses.
+
+    Returns (num_vars, num_clauses) or raises DimacsError with the number
+    of the offending line.
+    """
+    seen = None
+    nbvars = nbclauses = 0
+    header_line = 0
+    clauses = 0
+    open_clause = False
+    line_no = 0
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("c"):
+            continue
+        if line.startswith("%"):
+            break
+        if line.startswith("p"):
+            if seen is not None:
+                raise DimacsError(
+                    line_no, f"second problem line (first in line {header_line})")
+            parts = line.split()
+            try:
+                if len(parts) != 4 or parts[1] != "cnf":
+                    raise ValueError
+                nbvars, nbclauses = int(parts[2]), int(parts[3])
+                if nbvars < 0 or nbclauses < 0:
+                    raise ValueError
+            except ValueError:
+                raise DimacsError(
+                    line_no, f"malformed problem line {line!r}") from None
+            seen = bytearray(nbvars + 1)
+            header_line = line_no
+            continue
+        if seen is None:
+            raise DimacsError(line_no, "clause before problem line")
+
+        for token in line.split():
+            try:
+                lit = int(token)
+            except ValueError:
+                raise DimacsError(
+                    line_no, f"invalid literal {token!r}") from None
+            if lit == 0:
+                clauses += 1
+                open_clause = False
+                continue
+            v = -lit if lit < 0 else lit
+            if v > nbvars:
+                raise DimacsError(
+                    line_no, f"literal {lit} exceeds declared {nbvars} variables")
+            seen[v] = 1
+            open_clause = True
+
+    if seen is None:
+        raise DimacsError(line_no, "missing problem line")
+    if open_clause:
+        clauses += 1
+    if clauses != nbclauses:
+        raise DimacsError(
+            header_line, f"header declares {nbclauses} clauses, found {clauses}")
+    missing = seen.find(0, 1)
+    if missing != -1:
+        raise DimacsError(
+            header_line, f"variable {missing} is declared but never occurs")
+    return nbvars, nbclauses
+
+
+def split_clauses(tokens):
+    """Splits 0-terminated integer tokens into literals and clause offsets.
+    The 0 after the last clause is optional."""
+    zeros = np.flatnonzero(tokens == 0)
+    literals = tokens[tokens != 0]
+    # Each terminating 0 before a clause end shifts it by one position
+    ends = zeros - np.arange(len(zeros))
+    if len(literals) > (ends[-1] if len(ends) else 0):
+        ends = np.append(ends, len(literals))
+    offsets = np.concatenate(([0], ends)).astype(np.int64)
+    return literals, offsets
+
+
+def checked_literals(num_vars, literals):
+    """Checks that every literal is within the num_vars declared variables
+    and returns the literals as int32 where they fit."""
+    outside = (literals > num_vars) | (literals < -num_vars)
+    if outside.any():
+        raise ValueError(f"literal {literals[np.argmax(outside)]} exceeds "
+                         f"declared {num_vars} variables")
+    return literals.astype(np.int32) if num_vars < 2**31 else literals
+
+
+def parse_dimacs(data):
+    """Parses a DIMACS CNF buffer into flat literal and clause offset arrays.
+
+    Instead of converting token by token, comment and problem lines are cut
+    out with one regular expression and all remaining integers are
+    converted by numpy in a single call. Clauses may span lines and the 0
+    after the last clause is optional.
+
+    Returns (num_vars, literals, offsets) with the literals of clause i in
+    literals[offsets[i]:offsets[i + 1]] and num_vars from the problem line
+    (0 without one). Raises ValueError on tokens that are not integers and
+    on literals beyond num_vars.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    end = END_MARKER.search(data)
+    if end:
+        data = data[:end.start()]
+    header = PROBLEM_LINE.search(data)
+    body = SKIPPED_LINES.sub(b"", data)
+    if not body.strip():
+        # numpy reads a whitespace-only buffer as a single 0
+        body = b""
+
+    with warnings.catch_warnings():
+        # On a token that is not a number, numpy 2.x raises ValueError and
+        # older versions only warn with a DeprecationWarning and stop
+        # reading. Tokens are read as int64, which saturates instead of
+        # wrapping around, so the range check catches literals that
+        # overflow.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            tokens = np.fromstring(body, dtype=np.int64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError("invalid literal in DIMACS input") from None
+
+    literals, offsets = split_clauses(tokens)
+
+    num_vars = int(header.group(1)) if header else 0
+    return num_vars, checked_literals(num_vars, literals), offsets
+
+
+def parse_dimacs_lines(lines):
+    """Line-by-line reference parser with the same result as parse_dimacs."""
+    tokens = []
+    num_vars = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("c"):
+            continue
+        if line.startswith("%"):
+            break
+        if line.startswith("p"):
+            num_vars = int(line.split()[2])
+            continue
+        tokens.extend(map(int, line.split()))
+
+    literals, offsets = split_clauses(np.array(tokens, dtype=np.int64))
+    return num_vars, checked_literals(num_vars, literals), offsets
+
+
+class Formula:
+    """A CNF formula stored as one flat literal array plus clause offsets.
+
+    The literals of clause i are literals[offsets[i]:offsets[i + 1]].
+    Parse a problem once with Formula.from_file and share the object
+    between all checks of that problem.
+    """
+
+    def __init__(self, num_vars, literals, offsets):
+        self.num_vars = num_vars
+        self.literals = literals
+        self.offsets = offsets
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(*parse_dimacs(data))
+
+    @classmethod
+    def from_file(cls, file_path):
+        with open_instance(file_path) as f:
+            return cls.from_bytes(f.read())
+
+    @property
+    def num_clauses(self):
+        return len(self.offsets) - 1
+
+    def has_empty_clause(self):
+        return bool(np.any(np.diff(self.offsets) == 0))
+
+    def clauses(self):
+        """Yields the clauses as lists of ints, e.g. for pysat."""
+        literals = self.literals.tolist()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield literals[start:end]
+
+    def falsified_clauses(self, model):
+        """Returns the indices of all clauses that the model does not satisfy.
+
+        A clause is satisfied if one of its literals is contained in the
+        model; unassigned variables satisfy nothing. Literals of variables
+        beyond num_vars in the model are ignored.
+        """
+        n = self.num_vars
+        model = np.asarray(model, dtype=np.int64)
+        model = model[(model != 0) & (np.abs(model) <= n)]
+        true_lits = np.zeros(2 * n + 1, dtype=np.int32)
+        true_lits[model + n] = 1
+        # Satisfied literals per clause via prefix sums, which also handles
+        # empty clauses (unlike np.logical_or.reduceat)
+        prefix = np.concatenate(([0], np.cumsum(true_lits[self.literals + n])))
+        satisfied = prefix[self.offsets[1:]] - prefix[self.offsets[:-1]]
+        return np.flatnonzero(satisfied == 0)
+
+    def clause(self, index):
+        return self.literals[self.offsets[index]:self.offsets[index + 1]].tolist()
+
+
+def benchmark(paths, rounds=5):
+    """Prints the parsing throughput of the bulk and the line parser and
+    of check_dimacs, best of `rounds`, for every file."""
+    print(f"{'file':30} {'MB':>7} {'bulk MB/s':>10} {'lines MB/s':>11} "
+          f"{'check MB/s':>11}")
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        text = data.decode()
+        timings = []
+        for parse in (lambda: parse_dimacs(data),
+                      lambda: parse_dimacs_lines(text.splitlines()),
+                      lambda: check_dimacs(text.splitlines())):
+            best = float("inf")
+            try:
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    parse()
+                    best = min(best, time.perf_counter() - start)
+            except DimacsError:
+                pass
+            timings.append(best)
+        mb = len(data) / 1e6
+        # Files check_dimacs rejects show "-" in its column
+        print(f"{path[-30:]:30} {mb:7.2f} " + " ".join(
+            f"{mb / t:{w}.1f}" if t < float("inf") else f"{'-':>{w}}"
+            for t, w in zip(timings, (10, 11, 11))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the DIMACS parsers on CNF files.")
+    parser.add_argument("files", nargs="+", help="DIMACS CNF files")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="runs per parser and file (default: 5)")
+    args = parser.parse_args()
+    benchmark(args.files, args.rounds)
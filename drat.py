@@ -0,0 +1,550 @@
+"""DRAT proof checking for UNSAT answers.
+
+A solver that is started with the environment variable ARENA_PROOF can
+write a DRAT proof of unsatisfiability to the file it names, either in
+the text format (one lemma per line, `d` in front of deletions) or in
+the binary format. The checker works backwards from the conflict the
+proof ends in and only checks the lemmas that conflict actually depends
+on (the core): every core lemma must follow by reverse unit propagation
+(RUP) or be a resolution asymmetric tautology (RAT) on its first
+literal. Unit propagation uses watched literals and propagates over
+core clauses first, so the core stays small.
+
+If drat-trim is installed, proofs are checked with it instead, as it
+does the same backward check in C and is much faster. The checker here
+is used when drat-trim is missing or fails to run.
+
+    python drat.py problem.cnf proof.drat
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from itertools import islice
+
+import numpy as np
+
+from dimacs import Formula, split_clauses
+
+# Environment variable with the path a solver writes its proof to
+PROOF_ENV = "ARENA_PROOF"
+# Stands for the `d` of a deletion while parsing text proofs
+DELETE_MARK = 1 << 40
+# Bytes a text proof can start with; anything else means binary. As in
+# drat-trim, letters count as text, so a proof may start with a comment.
+TEXT_BYTES = frozenset(b"-0123456789 \t\r\n"
+                       + bytes(range(ord("A"), ord("z") + 1)))
+COMMENT_LINES = re.compile(rb"^[ \t]*c.*$", re.MULTILINE)
+DELETIONS = re.compile(rb"(?<!\S)d(?!\S)")
+# Proof steps between two looks at the deadline
+DEADLINE_INTERVAL = 256
+# drat-trim (github.com/marijnheule/drat-trim), None if it is not installed
+DRAT_TRIM = shutil.which("drat-trim")
+# drat-trim's answers: "s VERIFIED", "s TRIVIAL UNSAT" if unit propagation
+# alone refutes the formula, "s NOT VERIFIED"
+DRAT_TRIM_ANSWER = re.compile(rb"^s (VERIFIED|TRIVIAL UNSAT|NOT VERIFIED)",
+                              re.MULTILINE)
+
+
+class ProofError(ValueError):
+    """Raised when a proof is malformed or does not refute the formula."""
+
+
+def parse_text_proof(data):
+    body = DELETIONS.sub(b"%d" % DELETE_MARK, COMMENT_LINES.sub(b"", data))
+    if not body.strip():
+        # numpy reads a whitespace-only buffer as a single 0
+        body = b""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            tokens = np.fromstring(body, dtype=np.int64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ProofError("invalid token in text proof") from None
+
+    literals, offsets = split_clauses(tokens)
+    first = np.minimum(offsets[:-1], max(len(literals) - 1, 0))
+    deleted = (offsets[1:] > offsets[:-1]) & (literals[first] == DELETE_MARK) \
+        if len(literals) else np.zeros(len(offsets) - 1, dtype=bool)
+    marks = literals == DELETE_MARK
+    # Drop the marks and shift every offset by the marks before it
+    shift = np.concatenate(([0], np.cumsum(marks)))
+    return deleted, literals[~marks], offsets - shift[offsets]
+
+
+def parse_binary_proof(data):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if len(raw) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64), \
+            np.zeros(1, dtype=np.int64)
+    if raw[-1] != 0:
+        raise ProofError("binary proof does not end with a terminating 0")
+
+    # Every clause is an `a` or `d` byte, its literals as variable-length
+    # numbers (7 bits per byte, high bit = more bytes follow) and a 0 byte.
+    # A number's last byte is never 0, so every 0 byte ends a clause.
+    ends = raw == 0
+    marker = np.concatenate(([True], ends[:-1]))
+    kinds = raw[marker]
+    if not np.isin(kinds, (ord("a"), ord("d"))).all():
+        raise ProofError("binary proof line does not start with 'a' or 'd'")
+
+    number = ~(marker | ends)
+    digits = raw[number]
+    last = digits < 0x80
+    if len(digits) and not last[-1]:
+        raise ProofError("truncated number in binary proof")
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    group = np.cumsum(np.concatenate(([0], last[:-1])))
+    shift = 7 * (np.arange(len(digits)) - starts[group])
+    values = np.add.reduceat((digits & 0x7F).astype(np.int64) << shift, starts) \
+        if len(digits) else np.zeros(0, dtype=np.int64)
+    literals = np.where(values & 1, -(values >> 1), values >> 1)
+
+    clause_of = np.cumsum(marker)[np.flatnonzero(number)[last]] - 1
+    counts = np.bincount(clause_of, minlength=len(kinds))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return kinds == ord("d"), literals, offsets
+
+
+def parse_proof(data):
+    """Parses a text or binary DRAT proof.
+
+    Returns (deleted, literals, offsets): per proof step whether it
+    deletes a clause, and the literals of step i in
+    literals[offsets[i]:offsets[i + 1]].
+    """
+    if any(byte not in TEXT_BYTES for byte in data[:10]):
+        return parse_binary_proof(data)
+    return parse_text_proof(data)
+
+
+class Checker:
+    """Clause database with a top-level trail and two watch lists per
+    literal, one for core clauses and one for the rest.
+
+    Lists indexed by literal use Python's negative indices, so -v lands
+    on position 2 * num_vars + 1 - v. The first two literals of every
+    clause with at least two literals are watched.
+    """
+
+    def __init__(self, num_vars):
+        size = 2 * num_vars + 1
+        self.value = [0] * size  # 1 true, -1 false, 0 unassigned
+        self.watches = [[] for _ in range(size)]
+        self.core_watches = [[] for _ in range(size)]
+        self.reason = [-1] * (num_vars + 1)
+        self.position = [0] * (num_vars + 1)
+        self.seen = [0] * (num_vars + 1)
+        self.stamp = 0
+        self.trail = []
+        self.clauses = []
+        self.core = bytearray()
+        self.alive = bytearray()
+
+    def add(self, clause):
+        self.clauses.append(clause)
+        self.core.append(0)
+        self.alive.append(1)
+        return len(self.clauses) - 1
+
+    def _assign(self, lit, reason):
+        v = lit if lit > 0 else -lit
+        self.value[lit] = 1
+        self.value[-lit] = -1
+        self.reason[v] = reason
+        self.position[v] = len(self.trail)
+        self.trail.append(lit)
+
+    def backtrack(self, size):
+        value = self.value
+        reason = self.reason
+        trail = self.trail
+        for lit in trail[size:]:
+            value[lit] = value[-lit] = 0
+            reason[lit if lit > 0 else -lit] = -1
+        del trail[size:]
+
+    def attach(self, c):
+        """Watches clause c under the current trail and assigns its last
+        free literal if it is unit. Returns c if it is falsified, else -1."""
+        clause = self.clauses[c]
+        value = self.value
+        if len(clause) < 2:
+            if not clause or value[clause[0]] == -1:
+                return c
+            if value[clause[0]] == 0:
+                self._assign(clause[0], c)
+            return -1
+
+        # Non-false literals to the front, then the latest false ones
+        free = 0
+        for k in range(len(clause)):
+            if value[clause[k]] != -1:
+                clause[free], clause[k] = clause[k], clause[free]
+                free += 1
+                if free == 2:
+                    break
+        position = self.position
+        for k in range(free, 2):
+            latest = max(range(k, len(clause)),
+                         key=lambda i: position[abs(clause[i])])
+            clause[k], clause[latest] = clause[latest], clause[k]
+
+        watches = self.core_watches if self.core[c] else self.watches
+        watches[clause[0]].append(c)
+        watches[clause[1]].append(c)
+        if free == 0:
+            return c
+        if free == 1 and value[clause[0]] == 0:
+            self._assign(clause[0], c)
+        return -1
+
+    def detach(self, c):
+        clause = self.clauses[c]
+        if len(clause) >= 2:
+            watches = self.core_watches if self.core[c] else self.watches
+            watches[clause[0]].remove(c)
+            watches[clause[1]].remove(c)
+
+    def is_reason(self, c):
+        clause = self.clauses[c]
+        return len(clause) > 0 and self.value[clause[0]] == 1 and \
+            self.reason[abs(clause[0])] == c
+
+    def _mark(self, c):
+        """Moves clause c into the core (and its watches into the core
+        watch lists)."""
+        self.core[c] = 1
+        clause = self.clauses[c]
+        if len(clause) >= 2 and self.alive[c]:
+            for lit in clause[:2]:
+                self.watches[lit].remove(c)
+                self.core_watches[lit].append(c)
+
+    def propagate(self, head):
+        """Unit propagation from trail position head, over core clauses
+        first. Returns the falsified clause or -1."""
+        value = self.value
+        clauses = self.clauses
+        trail = self.trail
+        reason = self.reason
+        position = self.position
+        core_watches = self.core_watches
+        rest_watches = self.watches
+        core_head = rest_head = head
+        resume = 0  # entries of the current non-core list already done
+
+        while True:
+            # Non-core clauses are only visited once core propagation is
+            # done, and only until they yield the next unit
+            if core_head < len(trail):
+                watches = core_watches
+                false_lit = -trail[core_head]
+                core_head += 1
+                core = True
+                done = 0
+            elif rest_head < len(trail):
+                watches = rest_watches
+                false_lit = -trail[rest_head]
+                core = False
+                done = resume
+            else:
+                return -1
+
+            # The clauses that keep watching false_lit are collected in a
+            # new list; on an early exit the unvisited ones are kept as well
+            watch_list = watches[false_lit]
+            if done:
+                entries = islice(watch_list, done, None)
+                kept = watch_list[:done]
+            else:
+                entries = iter(watch_list)
+                kept = []
+            watches[false_lit] = kept
+            for c in entries:
+                clause = clauses[c]
+                if clause[0] == false_lit:
+                    clause[0] = clause[1]
+                    clause[1] = false_lit
+                first = clause[0]
+                if value[first] == 1:
+                    kept.append(c)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if value[lit] != -1:
+                        clause[1] = lit
+                        clause[k] = false_lit
+                        watches[lit].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if value[first] == -1:
+                        kept.extend(entries)
+                        return c
+                    value[first] = 1
+                    value[-first] = -1
+                    v = first if first > 0 else -first
+                    reason[v] = c
+                    position[v] = len(trail)
+                    trail.append(first)
+                    if not core:
+                        # Back to the core clauses, this list is resumed
+                        # afterwards
+                        resume = len(kept)
+                        kept.extend(entries)
+                        break
+            else:
+                if not core:
+                    rest_head += 1
+                    resume = 0
+
+    def analyze(self, conflict):
+        """Marks the conflict clause and all reasons it depends on as core."""
+        self.stamp += 1
+        stamp = self.stamp
+        seen = self.seen
+        reason = self.reason
+        core = self.core
+        stack = [conflict]
+        while stack:
+            c = stack.pop()
+            if not core[c]:
+                self._mark(c)
+            for lit in self.clauses[c]:
+                v = lit if lit > 0 else -lit
+                if seen[v] != stamp:
+                    seen[v] = stamp
+                    if reason[v] >= 0:
+                        stack.append(reason[v])
+
+    def rup(self, lits):
+        """Checks whether assigning the negation of lits leads to a
+        conflict by unit propagation, and marks the clauses used."""
+        value = self.value
+        start = len(self.trail)
+        conflict = -1
+        for lit in lits:
+            if value[lit] == 1:
+                conflict = self.reason[abs(lit)]
+                if conflict < 0:
+                    # lit and its negation are both in lits
+                    self.backtrack(start)
+                    return True
+                break
+            if value[lit] == 0:
+                self._assign(-lit, -1)
+        else:
+            conflict = self.propagate(start)
+            if conflict < 0:
+                self.backtrack(start)
+                return False
+        self.analyze(conflict)
+        self.backtrack(start)
+        return True
+
+    def rat(self, lemma, pivot):
+        """Checks whether lemma is a RAT on pivot: every resolvent with a
+        clause that contains the negated pivot must be RUP."""
+        candidates = [c for c, clause in enumerate(self.clauses)
+                      if self.alive[c] and -pivot in clause]
+        for c in candidates:
+            if not self.rup(lemma + [lit for lit in self.clauses[c]
+                                     if lit != -pivot]):
+                return False
+        for c in candidates:
+            if not self.core[c]:
+                self._mark(c)
+        return True
+
+
+def check_proof(formula, proof, deadline=None):
+    """Checks a DRAT proof (bytes, text or binary) of the formula's
+    unsatisfiability, with drat-trim if it is installed.
+
+    Returns a dict with the checker used and, for the checker in this
+    module, the number of lemmas, deletions and checked core lemmas.
+    Raises ProofError if the proof is invalid and TimeoutError once
+    time.monotonic() passes deadline.
+    """
+    if DRAT_TRIM:
+        stats = check_proof_drat_trim(formula, proof, deadline)
+        if stats is not None:
+            return stats
+    return check_proof_backward(formula, proof, deadline)
+
+
+def check_proof_drat_trim(formula, proof, deadline=None):
+    """Checks a proof with drat-trim, which reads the formula and the
+    proof from files. Returns None if drat-trim gives no answer, e.g.
+    because it cannot parse the input."""
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise TimeoutError
+    with tempfile.TemporaryDirectory() as tmp:
+        cnf_path = os.path.join(tmp, "problem.cnf")
+        proof_path = os.path.join(tmp, "proof.drat")
+        with open(cnf_path, "w") as f:
+            f.write(f"p cnf {formula.num_vars} {formula.num_clauses}\n")
+            f.writelines("".join(f"{lit} " for lit in clause) + "0\n"
+                         for clause in formula.clauses())
+        with open(proof_path, "wb") as f:
+            f.write(proof)
+        try:
+            res = subprocess.run([DRAT_TRIM, cnf_path, proof_path],
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError from None
+        except OSError:
+            return None
+
+    answer = DRAT_TRIM_ANSWER.search(res.stdout)
+    if answer is None:
+        return None
+    if answer.group(1) == b"NOT VERIFIED":
+        raise ProofError("drat-trim could not verify the proof")
+    return {"checker": "drat-trim"}
+
+
+def check_proof_backward(formula, proof, deadline=None):
+    """Checks a proof with the backward checker in this module.
+
+    Deletions of unit clauses and of clauses that are the reason of a
+    top-level assignment are ignored, as drat-trim does by default.
+    """
+    deleted, literals, offsets = parse_proof(proof)
+    deleted = deleted.tolist()
+    proof_lits = literals.tolist()
+    offsets = offsets.tolist()
+    num_vars = max(formula.num_vars,
+                   int(np.abs(formula.literals).max(initial=0)),
+                   int(np.abs(literals).max(initial=0)))
+    checker = Checker(num_vars)
+    stats = {"checker": "python", "lemmas": sum(not d for d in deleted),
+             "deletions": sum(deleted), "core_lemmas": 0, "rat_lemmas": 0}
+
+    # --- FORWARD PASS ---
+    # Adds the formula and the lemmas up to the first top-level conflict
+    index = {}
+    for clause in formula.clauses():
+        clause = list(dict.fromkeys(clause))
+        if not clause:
+            return stats  # the formula contains the empty clause
+        c = checker.add(clause)
+        index.setdefault(tuple(sorted(clause)), []).append(c)
+    conflict = -1
+    for c in range(len(checker.clauses)):
+        conflict = checker.attach(c)
+        if conflict >= 0:
+            break
+    if conflict < 0:
+        conflict = checker.propagate(0)
+
+    steps = []  # (clause, trail length before the step) per executed step
+    for i in range(len(deleted)):
+        if conflict >= 0:
+            break
+        if deadline is not None and i % DEADLINE_INTERVAL == 0 \
+                and time.monotonic() > deadline:
+            raise TimeoutError
+        clause = list(dict.fromkeys(proof_lits[offsets[i]:offsets[i + 1]]))
+        key = tuple(sorted(clause))
+
+        if deleted[i]:
+            ids = index.get(key)
+            c = ids[-1] if ids else -1
+            if c < 0 or len(clause) == 1 or checker.is_reason(c):
+                steps.append((-1, len(checker.trail)))
+                continue
+            ids.pop()
+            checker.alive[c] = 0
+            checker.detach(c)
+            steps.append((c, len(checker.trail)))
+            continue
+
+        if not clause:
+            raise ProofError(f"proof step {i + 1}: the empty clause does not "
+                             f"follow by unit propagation")
+        c = checker.add(clause)
+        index.setdefault(key, []).append(c)
+        steps.append((c, len(checker.trail)))
+        conflict = checker.attach(c)
+        if conflict < 0:
+            conflict = checker.propagate(steps[-1][1])
+
+    if conflict < 0:
+        raise ProofError("the proof does not derive the empty clause")
+    checker.analyze(conflict)
+
+    # --- BACKWARD PASS ---
+    # Undoes the steps in reverse order and checks every core lemma
+    # against the clauses that existed before it
+    for i in range(len(steps) - 1, -1, -1):
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError
+        c, trail_size = steps[i]
+        if c < 0:
+            continue
+        if deleted[i]:
+            checker.alive[c] = 1
+            checker.attach(c)
+            continue
+
+        checker.backtrack(trail_size)
+        checker.alive[c] = 0
+        checker.detach(c)
+        if not checker.core[c]:
+            continue
+        stats["core_lemmas"] += 1
+        lemma = checker.clauses[c]
+        if checker.rup(lemma):
+            continue
+        # The pivot of a RAT lemma is its first literal in the proof
+        pivot = proof_lits[offsets[i]]
+        if not checker.rat(lemma, pivot):
+            raise ProofError(f"proof step {i + 1}: lemma "
+                             f"{proof_lits[offsets[i]:offsets[i + 1]]} is "
+                             f"neither RUP nor RAT")
+        stats["rat_lemmas"] += 1
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Checks a DRAT proof of a CNF formula's "
+                    "unsatisfiability.")
+    parser.add_argument("problem", help="DIMACS CNF file")
+    parser.add_argument("proof", help="DRAT proof, text or binary")
+    parser.add_argument("--timeout", type=float,
+                        help="seconds before the check is given up")
+    parser.add_argument("--no-drat-trim", action="store_true",
+                        help="check with the Python checker even if "
+                             "drat-trim is installed")
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    formula = Formula.from_file(args.problem)
+    with open(args.proof, "rb") as f:
+        proof = f.read()
+    deadline = start + args.timeout if args.timeout else None
+    check = check_proof_backward if args.no_drat_trim else check_proof
+    try:
+        stats = check(formula, proof, deadline)
+    except ProofError as e:
+        print(f"s NOT VERIFIED ({e})")
+        sys.exit(1)
+    except TimeoutError:
+        print("s TIMEOUT")
+        sys.exit(2)
+    print("c " + ", ".join(f"{k}={v}" for k, v in stats.items()) +
+          f", time={time.monotonic() - start:.3f}s")
+    print("s VERIFIED")
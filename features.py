@@ -0,0 +1,173 @@
+"""Instance features and a runtime model for scheduling benchmark runs.
+
+extract_features computes cheap structural features of a CNF formula:
+its size, the clause/variable ratio, the clause length histogram,
+literal polarity, the share of Horn clauses and degree statistics of
+the variables and of the variable interaction graph. RuntimeModel
+predicts a solver's wall time on a problem from the solver's past
+results on the problems with the most similar features.
+
+    python features.py problems/*.cnf
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dimacs import Formula
+
+# Bump when extract_features changes, so cached features are recomputed
+FEATURES_VERSION = 1
+# Features the runtime model compares problems by, after log1p scaling
+MODEL_FEATURES = ("num_vars", "num_clauses", "ratio", "clause_len_mean",
+                  "frac_binary", "frac_horn", "var_degree_mean",
+                  "var_degree_cv", "vig_degree_mean", "vig_degree_max")
+# Past results a prediction is based on
+NEIGHBOURS = 5
+# Runtimes below this many seconds are not told apart
+MIN_RUNTIME = 0.01
+
+
+def degree_stats(name, degrees):
+    mean = float(degrees.mean()) if len(degrees) else 0.0
+    return {
+        f"{name}_mean": mean,
+        f"{name}_cv": float(degrees.std()) / mean if mean else 0.0,
+        f"{name}_min": int(degrees.min()) if len(degrees) else 0,
+        f"{name}_max": int(degrees.max(initial=0)),
+    }
+
+
+def extract_features(formula):
+    """Structural features of a formula as a flat dict of numbers.
+
+    A variable's degree is the number of clauses it occurs in. In the
+    variable interaction graph, two variables are adjacent if they share
+    a clause; its degrees count every shared clause, so a clause of
+    length k adds k - 1 to the degree of each of its variables. Degree
+    statistics only cover variables that occur.
+    """
+    literals = formula.literals.astype(np.int64)
+    lengths = np.diff(formula.offsets)
+    num_clauses = len(lengths)
+    variables = np.abs(literals)
+    num_vars = max(formula.num_vars, int(variables.max(initial=0)))
+    occurring = np.unique(variables)
+
+    clause_of = np.repeat(np.arange(num_clauses), lengths)
+    positives = np.bincount(clause_of[literals > 0], minlength=num_clauses)
+    var_degree = np.bincount(variables, minlength=num_vars + 1)
+    vig_degree = np.bincount(variables, weights=(lengths - 1)[clause_of],
+                             minlength=num_vars + 1)
+
+    def share(mask):
+        return float(np.count_nonzero(mask)) / num_clauses \
+            if num_clauses else 0.0
+
+    features = {
+        "num_vars": num_vars,
+        "num_clauses": num_clauses,
+        "num_literals": len(literals),
+        "ratio": num_clauses / num_vars if num_vars else 0.0,
+        "clause_len_mean": float(lengths.mean()) if num_clauses else 0.0,
+        "clause_len_max": int(lengths.max(initial=0)),
+        "frac_unit": share(lengths == 1),
+        "frac_binary": share(lengths == 2),
+        "frac_ternary": share(lengths == 3),
+        "frac_long": share(lengths > 3),
+        "frac_horn": share(positives <= 1),
+        "frac_positive": float(np.count_nonzero(literals > 0)) / len(literals)
+        if len(literals) else 0.0,
+    }
+    features.update(degree_stats("var_degree", var_degree[occurring]))
+    features.update(degree_stats("vig_degree", vig_degree[occurring]))
+    return features
+
+
+class RuntimeModel:
+    """Predicts wall times from past results with k nearest neighbours.
+
+    history holds past results with the columns solver_hash, problem_hash,
+    status, wall_sec and timeout_sec; features maps problem hashes to
+    their features. Solvers are told apart by their hash, so a changed
+    solver is not predicted from the old version's results. The trials of
+    a solver on a problem are reduced to their median runtime, with
+    timeouts counted as the full timeout. Timeouts under a shorter limit
+    than `timeout` are left out, as they say nothing about the current
+    limit.
+    """
+
+    def __init__(self, history, features, timeout):
+        self.timeout = timeout
+        columns = ["solver_hash", "problem_hash", "status", "wall_sec",
+                   "timeout_sec"]
+        history = pd.DataFrame(history, columns=columns)
+        timed_out = history["status"] == "TIMEOUT"
+        history = history[history["problem_hash"].isin(features.keys())
+                          & history["wall_sec"].notna()
+                          & (~timed_out | (history["timeout_sec"] >= timeout))]
+        timed_out = history["status"] == "TIMEOUT"
+        runtime = history["wall_sec"].clip(MIN_RUNTIME, timeout).where(
+            ~timed_out, timeout)
+        self.points = history.assign(
+            log_runtime=np.log(runtime), timed_out=timed_out).groupby(
+            ["solver_hash", "problem_hash"]).agg(
+            log_runtime=("log_runtime", "median"),
+            timed_out=("timed_out", "mean")).reset_index()
+
+        # Features are compared after log scaling and standardization over
+        # the problems in the history
+        vectors = {digest: self._vector(features[digest])
+                   for digest in self.points["problem_hash"].unique()}
+        matrix = np.array(list(vectors.values())).reshape(
+            -1, len(MODEL_FEATURES))
+        self.mean = matrix.mean(axis=0) if len(matrix) else 0.0
+        self.scale = matrix.std(axis=0) if len(matrix) else 1.0
+        self.scale = np.where(self.scale > 0, self.scale, 1.0)
+        self.matrix = np.array(
+            [(vectors[digest] - self.mean) / self.scale
+             for digest in self.points["problem_hash"]]).reshape(
+            -1, len(MODEL_FEATURES))
+
+    @staticmethod
+    def _vector(features):
+        return np.log1p(np.array([features[name] for name in MODEL_FEATURES],
+                                 dtype=float))
+
+    def __len__(self):
+        return len(self.points)
+
+    def predict(self, solver_hash, features):
+        """Predicted wall time of a solver on a problem in seconds, and
+        whether it will surely time out.
+
+        The prediction is the geometric mean runtime on the NEIGHBOURS
+        nearest problems the solver was run on; a solver without history
+        is predicted from the results of all solvers. A timeout is sure if
+        the solver timed out in most trials on all of these problems.
+        Returns (None, False) if there is no history at all.
+        """
+        own = (self.points["solver_hash"] == solver_hash).to_numpy()
+        rows = own if own.any() else np.ones(len(self.points), dtype=bool)
+        if not rows.any():
+            return None, False
+        target = (self._vector(features) - self.mean) / self.scale
+        distances = np.linalg.norm(self.matrix[rows] - target, axis=1)
+        nearest = np.argsort(distances, kind="stable")[:NEIGHBOURS]
+        points = self.points[rows].iloc[nearest]
+        seconds = float(np.exp(points["log_runtime"].mean()))
+        sure = bool(own.any() and len(points) == NEIGHBOURS
+                    and (points["timed_out"] > 0.5).all())
+        return seconds, sure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prints the instance features of CNF problems.")
+    parser.add_argument("problems", nargs="+", help="DIMACS CNF files")
+    args = parser.parse_args()
+
+    table = pd.DataFrame(
+        [extract_features(Formula.from_file(path)) for path in args.problems],
+        index=args.problems)
+    print(table.T.to_string(float_format="%.3f"))
@@ -0,0 +1,306 @@
+"""Runs a single solver process and measures its resource usage."""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+
+from dimacs import is_compressed, open_instance
+
+# Bytes written to the solver's stdin pipe at a time
+CHUNK_SIZE = 1 << 20
+
+# Forks and times the solver inside a freshly started, minimal interpreter.
+# A process inherits the peak RSS of the process it was forked from, so
+# spawning solvers directly from the runner (which holds pandas, numpy and
+# pysat) would put a floor of ~100 MB under every memory measurement.
+#
+# The launcher's timer also samples the solver's CPU time and RSS from
+# /proc every `interval` seconds. With a memory limit, the solver joins
+# the given cgroup, or gets a data rlimit if there is none. RLIMIT_DATA
+# counts the memory a process can write to, but not address space that
+# runtimes like the BEAM reserve up front. Given a core, the solver is
+# pinned to it before the exec, so pinning adds no process of its own.
+LAUNCHER = r"""
+import os, resource, signal, sys, time
+report_fd, timeout, interval, limit, cgroup, core = (
+    int(sys.argv[1]), float(sys.argv[2]), float(sys.argv[3]),
+    int(sys.argv[4]), sys.argv[5], sys.argv[6])
+argv = sys.argv[7:]
+ticks, page_kb = os.sysconf("SC_CLK_TCK"), os.sysconf("SC_PAGE_SIZE") // 1024
+start = time.monotonic()
+pid = os.fork()
+if pid == 0:
+    os.close(report_fd)
+    os.setpgid(0, 0)
+    if core != "-":
+        os.sched_setaffinity(0, {int(core)})
+    if limit and cgroup != "-":
+        try:
+            with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+        except OSError:
+            cgroup = "-"
+    if limit and cgroup == "-":
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    try:
+        os.execvp(argv[0], argv)
+    except OSError as e:
+        os.write(2, f"{argv[0]}: {e}\n".encode())
+    os._exit(127)
+try:
+    os.setpgid(pid, pid)
+except PermissionError:
+    pass  # the child has already called setpgid and exec'd
+timed_out = exited = False
+samples = []
+def sample(elapsed):
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            fields = f.read().rsplit(b")", 1)[1].split()
+    except OSError:
+        return
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    rss = int(fields[21]) * page_kb
+    samples.append(f"{elapsed:.3f} {cpu:.2f} {rss}")
+def on_alarm(signum, frame):
+    global timed_out
+    if exited:
+        return
+    elapsed = time.monotonic() - start
+    if elapsed >= timeout:
+        timed_out = True
+        os.killpg(pid, signal.SIGKILL)
+        return
+    sample(elapsed)
+    if timeout - elapsed < interval:
+        signal.setitimer(signal.ITIMER_REAL, timeout - elapsed)
+signal.signal(signal.SIGALRM, on_alarm)
+if 0 < interval < timeout:
+    signal.setitimer(signal.ITIMER_REAL, interval, interval)
+else:
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+wall = time.monotonic() - start
+exited = True
+signal.setitimer(signal.ITIMER_REAL, 0)
+_, status, ru = os.wait4(pid, 0)
+os.write(report_fd, "\n".join(
+    [f"{os.waitstatus_to_exitcode(status)} {int(timed_out)} {wall} "
+     f"{ru.ru_utime} {ru.ru_stime} {ru.ru_maxrss}"]
+    + samples).encode())
+"""
+
+# cgroup v2 hierarchy; runs get their own cgroup with a memory limit if
+# the runner may create them
+CGROUP_ROOT = "/sys/fs/cgroup"
+# What solvers print when an allocation fails under the rlimit
+OUT_OF_MEMORY = re.compile(
+    r"MemoryError|bad_alloc|memory allocation of \d+ bytes failed|"
+    r"Cannot allocate memory|out of memory|Out of memory|"
+    r"eheap_alloc: Cannot allocate")
+
+
+@lru_cache(maxsize=None)
+def memory_cgroup():
+    """The cgroup v2 directory that per-run cgroups are created in, or None
+    if there is none with the memory controller that the runner may use.
+
+    The memory controller can only be enabled for the children of a cgroup
+    without processes of its own, so the runner first moves itself into a
+    child cgroup.
+    """
+    try:
+        with open("/proc/self/cgroup") as f:
+            path = next(line[3:].strip() for line in f
+                        if line.startswith("0::"))
+        base = os.path.join(CGROUP_ROOT, path.lstrip("/"))
+        with open(os.path.join(base, "cgroup.controllers")) as f:
+            if "memory" not in f.read().split():
+                return None
+        with open(os.path.join(base, "cgroup.subtree_control")) as f:
+            enabled = "memory" in f.read().split()
+        if not enabled:
+            runner_cgroup = os.path.join(base, "arena-runner")
+            os.makedirs(runner_cgroup, exist_ok=True)
+            with open(os.path.join(runner_cgroup, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+            with open(os.path.join(base, "cgroup.subtree_control"), "w") as f:
+                f.write("+memory")
+    except (OSError, StopIteration):
+        return None
+    return base
+
+
+def create_cgroup(memory_limit):
+    """Creates a cgroup with the memory limit (in bytes) and no swap.
+    Returns its path, or None if cgroups are not available."""
+    parent = memory_cgroup()
+    if parent is None:
+        return None
+    try:
+        path = tempfile.mkdtemp(prefix="arena-run-", dir=parent)
+    except OSError:
+        return None
+    try:
+        with open(os.path.join(path, "memory.max"), "w") as f:
+            f.write(str(memory_limit))
+        try:
+            with open(os.path.join(path, "memory.swap.max"), "w") as f:
+                f.write("0")
+        except OSError:
+            pass  # no swap accounting
+    except OSError:
+        remove_cgroup(path)
+        return None
+    return path
+
+
+def remove_cgroup(path):
+    """Kills what is left in a run's cgroup and removes it. Returns whether
+    the kernel killed a process of it for exceeding the memory limit."""
+    oom_kills = 0
+    try:
+        with open(os.path.join(path, "memory.events")) as f:
+            for line in f:
+                name, value = line.split()
+                if name == "oom_kill":
+                    oom_kills = int(value)
+        with open(os.path.join(path, "cgroup.kill"), "w") as f:
+            f.write("1")
+    except OSError:
+        pass
+    for _ in range(100):
+        try:
+            os.rmdir(path)
+            break
+        except OSError:
+            time.sleep(0.01)  # killed processes are still exiting
+    return oom_kills > 0
+
+
+class Feeder(threading.Thread):
+    """Writes the decompressed content of path into pipe and closes it.
+
+    Stops quietly if the reading process exits before it has read
+    everything. delivery_sec is the time spent reading and decompressing
+    the input, without the time spent waiting for the reader.
+    """
+
+    def __init__(self, pipe, path):
+        super().__init__(daemon=True)
+        self.pipe = pipe
+        self.path = path
+        self.delivery_sec = 0.0
+
+    def run(self):
+        try:
+            with open_instance(self.path) as src:
+                while True:
+                    start = time.monotonic()
+                    chunk = src.read(CHUNK_SIZE)
+                    self.delivery_sec += time.monotonic() - start
+                    if not chunk:
+                        break
+                    self.pipe.write(chunk)
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                self.pipe.close()
+            except BrokenPipeError:
+                pass
+
+
+def run_measured(argv, stdin_path, timeout, env=None, memory_limit_mb=None,
+                 memory_cgroups=False, sample_interval=None, core=None):
+    """Runs argv with stdin read from stdin_path and measures it.
+
+    The solver is started without a shell or `cat` pipe, with the problem
+    file opened read-only as its stdin and in its own process group, which
+    is killed after `timeout` seconds. Wall time is taken around the
+    solver's lifetime, CPU times and peak RSS come from the rusage of
+    os.wait4. A compressed stdin_path is decompressed by the runner while
+    it is streamed into a pipe, so no uncompressed copy is written to disk.
+    env replaces the solver's environment if given.
+
+    With memory_limit_mb, the solver gets an RLIMIT_DATA of that size. With
+    memory_cgroups as well, it runs in its own cgroup v2 with that memory
+    limit instead, if the runner may create one. With sample_interval, the solver's CPU
+    time (user + system) and RSS are sampled every that many seconds.
+    With core, the solver is pinned to that CPU core.
+
+    Returns a dict with stdout, stderr, exit_code, timed_out, mem_out,
+    wall_sec, cpu_sec (user), sys_sec, memory_kb, samples, a list of
+    (seconds since start, CPU seconds, RSS in KB), and delivery_sec, the
+    runner's time for handing over the input: opening the file, or
+    decompressing it.
+    """
+    compressed = is_compressed(stdin_path)
+    memory_limit = (memory_limit_mb or 0) * 1024 * 1024
+    cgroup = create_cgroup(memory_limit) \
+        if memory_limit and memory_cgroups else None
+    report_r, report_w = os.pipe()
+    delivery_start = time.monotonic()
+    with (nullcontext(subprocess.PIPE) if compressed
+          else open(stdin_path, "rb")) as stdin, \
+            tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        delivery_sec = time.monotonic() - delivery_start
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, "-S", "-I", "-c", LAUNCHER, str(report_w),
+                 str(timeout), str(sample_interval or 0), str(memory_limit),
+                 cgroup or "-", "-" if core is None else str(core)] + argv,
+                stdin=stdin, stdout=out, stderr=err, pass_fds=(report_w,),
+                env=env)
+        finally:
+            os.close(report_w)
+        feeder = None
+        if compressed:
+            feeder = Feeder(proc.stdin, stdin_path)
+            feeder.start()
+        with os.fdopen(report_r, "rb") as report:
+            lines = report.read().decode().splitlines()
+        proc.wait()
+        oom_killed = cgroup is not None and remove_cgroup(cgroup)
+        if feeder is not None:
+            # Once the solver is gone, the pipe is broken and the feeder ends
+            feeder.join()
+            delivery_sec = feeder.delivery_sec
+
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode(errors="replace")
+        stderr = err.read().decode(errors="replace")
+
+    fields = lines[0].split() if lines else []
+    if len(fields) != 6:
+        raise RuntimeError(
+            f"measurement of {argv[0]} failed (exit code {proc.returncode}): "
+            f"{stderr.strip()}")
+    exit_code, timed_out, wall, utime, stime, maxrss = fields
+    timed_out = timed_out == "1"
+    # Under the rlimit a solver only notices the limit when an allocation
+    # fails, and reports it in its own words
+    mem_out = oom_killed or (
+        memory_limit > 0 and cgroup is None and not timed_out
+        and int(exit_code) != 0 and OUT_OF_MEMORY.search(stderr) is not None)
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "exit_code": int(exit_code),
+        "timed_out": timed_out,
+        "mem_out": mem_out,
+        "wall_sec": float(wall),
+        "cpu_sec": float(utime),
+        "sys_sec": float(stime),
+        # ru_maxrss is reported in kilobytes on Linux
+        "memory_kb": int(maxrss),
+        "samples": [(float(t), float(cpu), int(rss)) for t, cpu, rss
+                    in (line.split() for line in lines[1:])],
+        "delivery_sec": delivery_sec,
+    }
@@ -0,0 +1,170 @@
+"""Portfolio racing: answers CNF instances with all arena solvers at once.
+
+Every solver in SOLVERS_DIR is started on the same problem, each pinned to
+its own core where possible. The first answer that passes the model check
+wins; the other solvers are killed.
+
+    python race.py problem.cnf [problem.cnf ...] [--timeout 30]
+
+Several problems can be given to race them one after another without
+paying the interpreter startup for each.
+"""
+import argparse
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+import arena
+from dimacs import Formula, is_compressed
+from measure import Feeder
+
+
+def verified_answer(formula, status, model):
+    """Checks a solver's claim with check_model.
+
+    There is no expected result to compare against, so a SAT answer is
+    only accepted with a model that satisfies the formula. UNSAT answers
+    are accepted unless the solver gives a model that satisfies the
+    formula.
+    """
+    if status == "SAT" and model is None:
+        return False, "SAT (no model given)"
+    correct, note = arena.check_model(formula, status, model)
+    return correct and note != "Invalid Countermodel", note
+
+
+def kill(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def race(cnf_path, solvers, timeout=arena.TIMEOUT_SECONDS):
+    """Races the solvers on one problem.
+
+    Every solver opens the problem file as its own stdin, so they all read
+    it concurrently from the page cache. A compressed problem is instead
+    decompressed into a pipe per solver. Returns a dict with the winning
+    solver, its status, model and wall time, plus the answers rejected
+    before, or None if no solver gave an accepted answer in time. Raises
+    ValueError if the problem is not valid DIMACS.
+    """
+    cores = arena.available_cores()
+    compressed = is_compressed(cnf_path)
+    start = time.monotonic()
+    procs = {}
+    pipes = []
+    finished = queue.SimpleQueue()
+
+    def wait_for(solver_name, proc):
+        stdout, _ = proc.communicate()
+        finished.put((solver_name, stdout, time.monotonic() - start))
+
+    result = {"winner": None, "rejected": []}
+    try:
+        for i, solver_name in enumerate(solvers):
+            core = cores[i % len(cores)] if len(cores) > 1 else None
+            with (nullcontext(subprocess.PIPE) if compressed
+                  else open(cnf_path, "rb")) as stdin:
+                proc = subprocess.Popen(
+                    arena.solver_argv(solver_name), stdin=stdin,
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                    preexec_fn=arena.pin_to_core(core))
+            procs[solver_name] = proc
+            if compressed:
+                # The feeder owns the pipe, communicate() must not close it
+                pipes.append(proc.stdin)
+                proc.stdin = None
+
+        # Threads are only started once all solvers are, as preexec_fn is
+        # not safe while other threads run
+        for pipe in pipes:
+            Feeder(pipe, cnf_path).start()
+        for solver_name, proc in procs.items():
+            threading.Thread(target=wait_for, args=(solver_name, proc),
+                             daemon=True).start()
+
+        # Parsed while the solvers are already running
+        formula = Formula.from_file(cnf_path)
+        for _ in procs:
+            remaining = start + timeout - time.monotonic()
+            try:
+                solver_name, stdout, wall = finished.get(
+                    timeout=max(remaining, 0))
+            except queue.Empty:
+                break
+            try:
+                status, model = arena.parse_output(
+                    stdout.decode(errors="replace"),
+                    procs[solver_name].returncode, False)
+            except ValueError:
+                status, model = "ERROR", None
+            accepted, note = verified_answer(formula, status, model)
+            if accepted:
+                result.update(winner=solver_name, status=status, model=model,
+                              wall_sec=wall, note=note)
+                break
+            result["rejected"].append((solver_name, status, wall, note))
+    finally:
+        # Also runs if a solver fails to start, so that the solvers
+        # started before it do not keep running
+        for proc in procs.values():
+            kill(proc)
+        for proc in procs.values():
+            proc.wait()
+
+    return result if result["winner"] else None
+
+
+def print_answer(result):
+    """Prints the winning answer in the DIMACS output format."""
+    if result["status"] == "SAT":
+        print("s SATISFIABLE")
+        print("v " + " ".join(map(str, result["model"])) + " 0")
+    else:
+        print("s UNSATISFIABLE")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Races all solvers on CNF problems and reports the "
+                    "first verified answer.")
+    parser.add_argument("problems", nargs="+", help="DIMACS CNF files")
+    parser.add_argument(
+        "--timeout", type=float, default=arena.TIMEOUT_SECONDS,
+        help=f"seconds per problem (default: {arena.TIMEOUT_SECONDS})")
+    parser.add_argument(
+        "--solvers", nargs="+", metavar="SOLVER",
+        help="solvers to race (default: all in the solvers directory)")
+    args = parser.parse_args()
+
+    solvers = args.solvers or arena.list_solvers()
+    exit_code = 0
+    for cnf_path in args.problems:
+        print(f"c --- {cnf_path} ---", flush=True)
+        try:
+            result = race(cnf_path, solvers, args.timeout)
+        except ValueError as e:
+            print(f"c invalid instance: {e}")
+            print("s UNKNOWN", flush=True)
+            continue
+        if result is None:
+            print("c no verified answer")
+            print("s UNKNOWN", flush=True)
+            continue
+        for solver_name, status, wall, note in result["rejected"]:
+            print(f"c rejected {solver_name}: [{status}] {wall:.3f}s - {note}")
+        print(f"c winner {result['winner']}: [{result['status']}] "
+              f"{result['wall_sec']:.3f}s - {result['note']}")
+        print_answer(result)
+        exit_code = 10 if result["status"] == "SAT" else 20
+    # With a single problem, exit like a SAT solver (10 = SAT, 20 = UNSAT)
+    sys.exit(exit_code if len(args.problems) == 1 else 0)
@@ -1,20 +1,84 @@
+import argparse
+import gzip
+import hashlib
+import json
+import statistics
 import subprocess
-import re
 import os
+import queue
+import re
 import tempfile
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import pandas as pd
 import matplotlib.pyplot as plt
-from pysat.formula import CNF
+import numpy as np
+from matplotlib.container import BarContainer
+import pysat
 from pysat.solvers import Solver
 
+from arena import (SOLVERS_DIR, TIMEOUT_SECONDS, available_cores,
+                   check_model, list_solvers, parse_output, pin_to_core,
+                   resolve_solver, solver_argv, solver_variants)
+from dimacs import (CNF_SUFFIXES, DimacsError, Formula, check_dimacs,
+                    open_instance)
+from drat import PROOF_ENV, ProofError, check_proof
+from features import FEATURES_VERSION, RuntimeModel, extract_features
+from measure import run_measured
+from stats import summarize_trials
+from analysis import PAR_FACTOR, par_scores, plot_cactus
+from store import KEY_FIELDS, ResultStore, machine_id, run_key
+
 # --- CONFIGURATION ---
 PROBLEMS_DIR = "/app/problems"
-SOLVERS_DIR = "/app/solvers"
 RESULTS_DIR = "/app/results"
 RESULTS_FILE = os.path.join(RESULTS_DIR, "benchmark_data.csv")
-
-TIMEOUT_SECONDS = 30
+SUMMARY_FILE = os.path.join(RESULTS_DIR, "benchmark_summary.csv")
+SCORES_FILE = os.path.join(RESULTS_DIR, "benchmark_scores.csv")
+DB_FILE = os.path.join(RESULTS_DIR, "benchmark.db")
+CACHE_DIR = os.path.join(RESULTS_DIR, "cache")
+REFERENCE_CACHE_FILE = os.path.join(CACHE_DIR, "reference_results.json")
+FEATURE_CACHE_FILE = os.path.join(CACHE_DIR, "instance_features.json")
+INSTANCE_STORE_DIR = os.path.join(CACHE_DIR, "instances")
+
+# Whether UNSAT answers are repeated with proof logging to check their DRAT
+# proof, and the time limit for checking one. It is separate from the
+# solver timeout: without drat-trim, the Python checker needs about a
+# minute for the proof of a uuf250 instance.
+CHECK_PROOFS = False
+PROOF_TIMEOUT_SECONDS = 120
+# Memory limit per solver run (0 = none), and the interval at which the
+# CPU time and RSS of a run are sampled
+MEMORY_LIMIT_MB = 4096
+SAMPLE_INTERVAL_SECONDS = 0.1
+# Enforce the memory limit with a cgroup per run instead of an rlimit. This
+# moves the runner into a cgroup of its own (see measure.memory_cgroup).
+MEMORY_CGROUPS = False
+# Leave out solver/problem pairs the runtime model is sure will time out,
+# and the note of the timeouts they are reported as
+SKIP_PREDICTED_TIMEOUTS = False
+SKIPPED_NOTE = "skipped: predicted timeout"
+
+# Search statistics reported by solvers, e.g. "c stat decisions 12345"
+STAT_LINE = re.compile(r"^c stat (\w+) (\S+)\s*$", re.MULTILINE)
+
+# pysat solver that decides the expected result of UNKNOWN problems
+REFERENCE_SOLVER = "cadical195"
+
+# Null solvers that only start a runtime and read stdin. Their cost is
+# measured on each machine and reported as startup overhead per runtime.
+STARTUP_BASELINE_RUNS = 5
+STARTUP_BASELINES = {
+    "python": ["python3", "-c", "import sys; sys.stdin.read()"],
+    "python+pysat": ["python3", "-c",
+                     "import sys; from pysat.formula import CNF; "
+                     "from pysat.solvers import Solver; sys.stdin.read()"],
+    "elixir": ["elixir", "-e", "IO.read(:stdio, :eof)"],
+    "escript": ["escript", "{escript}"],
+    "native": ["cat"],
+}
+NULL_ESCRIPT = "#!/usr/bin/env escript\nmain(_) -> io:get_chars('', 1).\n"
 
 BENCHMARK_SUITE = [
     ("No_Clauses", ["true"], "SAT"),
@@ -35,32 +99,23 @@ BENCHMARK_SUITE = [
 
 def verify_dimacs(file_path: str) -> bool:
     print(f"verifying DIMACS encoding in {file_path}...", end=" ", flush=True)
-    with open(file_path) as f:
-        literals = set()
-        nbvars = 0
-        for line in f:
-            line = line.strip()
-            if line.startswith("c"):
-                continue
-            elif line.startswith("p"):
-                nbvars = int(line.split()[2])
-            else:
-                literals = literals.union(
-                    {abs(int(l)) for l in line.split()[:-1]})
-        if all(l > 0 for l in literals) and all(l in literals for l in range(1, nbvars+1)):
-            print("verified!")
-            return True
-        else:
-            print("could not be verified!")
-            return False
+    try:
+        with open_instance(file_path, "rt") as f:
+            check_dimacs(f)
+    except DimacsError as e:
+        print(f"could not be verified! ({e})")
+        return False
+    print("verified!")
+    return True
 
 
 def discover_static_problems():
-    """Scans /app/problems for .cnf files and adds them to the suite."""
+    """Scans /app/problems for .cnf files, plain or compressed (.cnf.gz,
+    .cnf.xz, .cnf.bz2), and adds them to the suite."""
     if not os.path.exists(PROBLEMS_DIR):
         return
     for f in os.listdir(PROBLEMS_DIR):
-        if f.endswith(".cnf"):
+        if f.endswith(CNF_SUFFIXES):
             path = os.path.join(PROBLEMS_DIR, f)
             if f.startswith("uf") or f.startswith("bw_"):
                 expected = "SAT"
@@ -68,125 +123,258 @@ def discover_static_problems():
                 expected = "UNSAT"
             else:
                 expected = "UNKNOWN"
-        BENCHMARK_SUITE.append((f, path, expected))
-
-
-def parse_output(stdout_str, stderr_str, exit_code):
-    """Parses time, memory, status (SAT/UNSAT), and model (assignments)."""
-    mem_match = re.search(
-        r"Maximum resident set size \(kbytes\): (\d+)", stderr_str)
-    cpu_time_match = re.search(r"User time \(seconds\): ([\d\.]+)", stderr_str)
-    wall_time_match = re.search(
-        r"Elapsed \(wall clock\) time.*: (\d+(?::\d+){1,2}(?:\.\d+)?)", stderr_str)
-    mem_kb = int(mem_match.group(1)) if mem_match else 0
-    cpu_time_sec = float(cpu_time_match.group(1)) if cpu_time_match else 0.0
-
-    wall_time_str = wall_time_match.group(1) if wall_time_match else None
-
-    if wall_time_str:
-        parts = wall_time_str.split(':')
+            BENCHMARK_SUITE.append((f, path, expected))
+
+
+def parse_stats(stdout_str):
+    """Collects the search statistics a solver reports as
+    `c stat <name> <value>` lines, as {"stat_<name>": value}. Values
+    that are not numbers are skipped."""
+    stats = {}
+    for name, value in STAT_LINE.findall(stdout_str):
+        for number in (int, float):
+            try:
+                stats[f"stat_{name}"] = number(value)
+                break
+            except ValueError:
+                pass
+    return stats
+
+
+def file_hash(file_path):
+    """Returns the SHA-256 hex digest of a file's content, after
+    decompression for compressed instances."""
+    digest = hashlib.sha256()
+    with open_instance(file_path) as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def solve_reference(formula):
+    """Solves a problem with the reference solver, returns SAT or UNSAT."""
+    if formula.has_empty_clause():
+        # Some pysat backends reject empty clauses on bootstrap
+        return "UNSAT"
+    with Solver(name=REFERENCE_SOLVER,
+                bootstrap_with=formula.clauses()) as solver:
+        return "SAT" if solver.solve() else "UNSAT"
+
+
+def load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_reference_cache():
+    """Loads the cached reference results, keyed by problem content hash."""
+    return load_cache(REFERENCE_CACHE_FILE)
+
+
+def save_reference_cache(cache):
+    """Atomically writes the reference results back to disk."""
+    save_cache(REFERENCE_CACHE_FILE, cache)
+
+
+def reference_result(cache, prob_name, digest, formula):
+    """Returns the expected result of an UNKNOWN problem.
+
+    The verdict is looked up by digest, the content hash of the instance
+    from file_hash, and only computed if no entry from the current
+    reference solver exists. A new entry replaces all entries of the same
+    problem name, so outdated verdicts are evicted as soon as an instance
+    changes.
+    """
+    entry = cache.get(digest)
+    if entry is not None and entry["solver"] == REFERENCE_SOLVER:
+        return entry["result"], True
+
+    result = solve_reference(formula)
+    for key in [k for k, e in cache.items() if e["problem"] == prob_name]:
+        del cache[key]
+    cache[digest] = {
+        "problem": prob_name,
+        "result": result,
+        "solver": REFERENCE_SOLVER,
+        "pysat_version": pysat.__version__,
+    }
+    save_reference_cache(cache)
+    return result, False
+
+
+def instance_features(cache, problem_hash, formula):
+    """Returns the features of a problem, extracted once per content hash
+    and FEATURES_VERSION."""
+    entry = cache.get(problem_hash)
+    if entry is None or entry.get("version") != FEATURES_VERSION:
+        entry = {"version": FEATURES_VERSION, **extract_features(formula)}
+        cache[problem_hash] = entry
+    return entry
+
+
+@lru_cache(maxsize=None)
+def cnfgen_version():
+    """Returns the version string reported by the installed cnfgen."""
+    res = subprocess.run(["cnfgen", "--version"],
+                         capture_output=True, text=True, check=True)
+    return (res.stdout or res.stderr).strip()
+
+
+def generated_instance(args, compress=False):
+    """Returns the path of the stored cnfgen instance for an argument list.
+
+    Instances are keyed by the cnfgen version and the argument vector and
+    are only generated if the store does not contain them yet. Generators
+    without an explicit --seed are therefore fixed to the first instance
+    generated on this machine.
+    """
+    key = hashlib.sha256(json.dumps(
+        [cnfgen_version(), args]).encode()).hexdigest()
+    for suffix in (".cnf", ".cnf.gz"):
+        path = os.path.join(INSTANCE_STORE_DIR, key + suffix)
+        if os.path.exists(path):
+            return path
+
+    os.makedirs(INSTANCE_STORE_DIR, exist_ok=True)
+    path = os.path.join(INSTANCE_STORE_DIR,
+                        key + (".cnf.gz" if compress else ".cnf"))
+    with tempfile.NamedTemporaryFile(dir=INSTANCE_STORE_DIR, delete=False) as tmp:
         try:
-            if len(parts) == 3:
-                h = int(parts[0])
-                m = int(parts[1])
-                s = float(parts[2])
-            elif len(parts) == 2:
-                h = 0
-                m = int(parts[0])
-                s = float(parts[1])
+            if compress:
+                res = subprocess.run(["cnfgen"] + args, stdout=subprocess.PIPE,
+                                     check=True)
+                with gzip.open(tmp, "wb") as gz:
+                    gz.write(res.stdout)
             else:
-                raise ValueError("Unexpected time format")
-            wall_time_sec = h * 3600 + m * 60 + s
-        except (ValueError, TypeError):
-            wall_time_sec = 0.0
-    else:
-        wall_time_sec = 0.0
-
-    status = "ERROR"
-
-    if exit_code == 124:
-        status = "TIMEOUT"
-    elif exit_code not in {0, 10, 20}:
-        print(f"Warning: Solver exited with code {exit_code}", flush=True)
-
-    if "s SATISFIABLE" in stdout_str:
-        status = "SAT"
-    elif "s UNSATISFIABLE" in stdout_str:
-        status = "UNSAT"
-
-    model = None
-    for line in stdout_str.splitlines():
-        if line.startswith("v "):
-            model = []
-            parts = line[2:].strip().split()
-            for p in parts:
-                if p != '0':
-                    model.append(int(p))
-            break
-
-    return mem_kb, wall_time_sec, cpu_time_sec, status, model
-
-
-def verify_correctness(cnf_path, status, model, expected_result):
-    """Checks if the result is correct."""
-
-    if status == "TIMEOUT":
-        return False, "TIMEOUT"
+                subprocess.run(["cnfgen"] + args, stdout=tmp, check=True)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
+
+    with open(os.path.join(INSTANCE_STORE_DIR, key + ".json"), "w") as f:
+        json.dump({"cnfgen": cnfgen_version(), "args": args}, f)
+    return path
+
+
+def prewarm_instances(compress=False):
+    """Generates every cnfgen instance of the suite into the store."""
+    for prob_name, source, _ in BENCHMARK_SUITE:
+        if isinstance(source, list):
+            print(f"Generating {prob_name}...", end=" ", flush=True)
+            print(generated_instance(source, compress), flush=True)
+
+
+def solver_proof(argv, cnf_path, core=None):
+    """Runs a solver again, unmeasured, with ARENA_PROOF set and returns
+    the DRAT proof it wrote for an UNSAT answer, b"" if there is none.
+
+    Proof logging costs time and memory, so measured runs never log
+    proofs. The rerun gets the same timeout and memory limit.
+    """
+    proof_fd, proof_path = tempfile.mkstemp(suffix=".drat")
+    os.close(proof_fd)
+    try:
+        res = run_measured(argv, cnf_path, TIMEOUT_SECONDS,
+                           env={**os.environ, PROOF_ENV: proof_path},
+                           memory_limit_mb=MEMORY_LIMIT_MB,
+                           memory_cgroups=MEMORY_CGROUPS, core=core)
+        status, _ = parse_output(
+            res["stdout"], res["exit_code"], res["timed_out"])
+        if status != "UNSAT" or res["mem_out"]:
+            return b""
+        with open(proof_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(proof_path)
+
+
+def check_unsat_proof(formula, proof):
+    """Checks the DRAT proof a solver wrote for an UNSAT answer.
+
+    Returns the outcome for verify_correctness and the checking time in
+    seconds, or (None, None) if the solver wrote no proof.
+    """
+    if not proof:
+        return None, None
+
+    start = time.monotonic()
+    try:
+        check_proof(formula, proof, start + PROOF_TIMEOUT_SECONDS)
+        outcome = (True, None)
+    except ProofError as e:
+        outcome = (False, str(e))
+    except TimeoutError:
+        outcome = (None, None)
+    return outcome, time.monotonic() - start
+
+
+def verify_correctness(formula, status, model, expected_result, proof=None):
+    """Checks if the result is correct.
+
+    proof is the outcome of check_unsat_proof for an UNSAT answer with a
+    proof: (True, None) if it was verified, (False, reason) if it is
+    invalid and (None, None) if the check timed out. A verified proof
+    makes the reference run for UNKNOWN problems unnecessary.
+    """
+
+    if status in ("TIMEOUT", "MEMOUT"):
+        return False, status
+
+    if status == "UNSAT" and proof is not None:
+        verified, reason = proof
+        if verified is False:
+            return False, f"Invalid Proof ({reason})"
+        if verified and expected_result in ("UNSAT", "UNKNOWN"):
+            return True, "UNSAT (proof verified)"
 
     if expected_result == "UNKNOWN":
-        solver = Solver()
-        formula = CNF(from_file=cnf_path)
-        solver.append_formula(formula)
-        match solver.solve():
-            case True: "SAT"
-            case False: "UNSAT"
-            case None: "UNKNOWN"
-        if solver.solve():
-            expected_result = "SAT"
-        else:
-            expected_result = "UNSAT"
+        expected_result = solve_reference(formula)
 
     if expected_result != "UNKNOWN" and status != expected_result:
         return False, f"Wrong Result (Expected {expected_result}, Got {status})"
 
-    if status == "SAT":
-        if model is None:
-            return True, "SAT (no model given)"
+    if status == "UNSAT" and model is None and proof is not None:
+        return True, "UNSAT (proof check timed out)"
 
-        formula = CNF(from_file=cnf_path)
-        model_set = set(model)
+    return check_model(formula, status, model)
 
-        for clause in formula.clauses:
-            if not any(lit in model_set for lit in clause):
-                return False, f"Invalid Model (Clause {clause} failed)"
 
-        return True, "SAT (given model verified)"
+def pivot_with_ci(summary, metric, scale=1):
+    """Pivots a metric's medians to problem x solver, plus CI error bars.
 
-    if status == "UNSAT":
-        if model is None:
-            return True, "UNSAT (no countermodel given)"
+    The error bars are returned as an array of shape (solvers, 2, problems)
+    as expected by DataFrame.plot(yerr=...).
+    """
+    median = summary.pivot(
+        index='problem', columns='solver', values=f'{metric}_median') / scale
+    low = summary.pivot(
+        index='problem', columns='solver', values=f'{metric}_ci_low') / scale
+    high = summary.pivot(
+        index='problem', columns='solver', values=f'{metric}_ci_high') / scale
+    yerr = np.stack([(median - low).to_numpy().T, (high - median).to_numpy().T],
+                    axis=1)
+    return median, yerr
 
-        formula = CNF(from_file=cnf_path)
-        model_set = set(model)
 
-        countersat = False
-        if len(formula.clauses) == 0 and len(model_set) == 0:
-            countersat = True
-        for clause in formula.clauses:
-            if len([*filter(lambda lit: lit not in model_set, clause)]) == 0:
-                countersat = True
-                break
+def generate_plots(summary):
+    """Generates Time and Memory comparison charts with LARGE fonts.
 
-        if countersat:
-            return True, "UNSAT (given countermodel verified)"
-        else:
-            return True, "Invalid Countermodel"
-
-    return False, "Solver Error"
-
-
-def generate_plots(df):
-    """Generates Time and Memory comparison charts with LARGE fonts."""
+    Bars show the median over all trials, error bars its confidence
+    interval. In the wall time chart, bars whose difference to the
+    fastest solver on that problem is not significant are marked "n.s.".
+    """
     print("Generating plots...", end=" ", flush=True)
 
     FIG_SIZE = (24, 12)
@@ -200,10 +388,19 @@ def generate_plots(df):
     # --- Plot 1: Wall Time ---
     fig, ax = plt.subplots(figsize=FIG_SIZE)
 
-    pivot_time = df.pivot(
-        index='problem', columns='solver', values='wall_sec')
+    pivot_time, yerr_time = pivot_with_ci(summary, 'wall_sec')
+
+    pivot_time.plot(kind='bar', width=0.8, ax=ax, logy=True,
+                    yerr=yerr_time, capsize=2)
 
-    pivot_time.plot(kind='bar', width=0.8, ax=ax, logy=True)
+    tied = summary.pivot(index='problem', columns='solver',
+                         values='wall_sec_tied')
+    bars = [c for c in ax.containers if isinstance(c, BarContainer)]
+    for solver, container in zip(pivot_time.columns, bars):
+        labels = ["n.s." if t and (tied.loc[p].sum() > 1) else ""
+                  for p, t in tied[solver].items()]
+        ax.bar_label(container, labels=labels, fontsize=F_TICKS - 4,
+                     rotation=90, padding=3)
 
     ax.axhline(y=TIMEOUT_SECONDS, color='r', linestyle='--', label='Timeout')
 
@@ -226,10 +423,10 @@ def generate_plots(df):
     # --- Plot 2: CPU Time ---
     fig, ax = plt.subplots(figsize=FIG_SIZE)
 
-    pivot_cpu = df.pivot(
-        index='problem', columns='solver', values='cpu_sec')
+    pivot_cpu, yerr_cpu = pivot_with_ci(summary, 'cpu_sec')
 
-    pivot_cpu.plot(kind='bar', width=0.8, ax=ax, logy=True)
+    pivot_cpu.plot(kind='bar', width=0.8, ax=ax, logy=True,
+                   yerr=yerr_cpu, capsize=2)
 
     ax.set_title('Solver CPU Time (Log Scale)', fontsize=F_TITLE, pad=20)
     ax.set_ylabel('Seconds (Log Scale)', fontsize=F_AXIS_LABEL)
@@ -250,9 +447,10 @@ def generate_plots(df):
     # --- Plot 3: Memory ---
     fig, ax = plt.subplots(figsize=FIG_SIZE)
 
-    pivot_mem = df.pivot(index='problem', columns='solver', values='memory_kb')
+    # Convert to MB
+    pivot_mem, yerr_mem = pivot_with_ci(summary, 'memory_kb', scale=1024)
 
-    (pivot_mem / 1024).plot(kind='bar', width=0.8, ax=ax)  # Convert to MB
+    pivot_mem.plot(kind='bar', width=0.8, ax=ax, yerr=yerr_mem, capsize=2)
 
     ax.set_title('Solver Peak Memory Usage', fontsize=F_TITLE, pad=20)
     ax.set_ylabel('Memory (MB)', fontsize=F_AXIS_LABEL)
@@ -268,106 +466,490 @@ def generate_plots(df):
     plt.savefig(os.path.join(RESULTS_DIR, 'benchmark_memory.png'), dpi=100)
     plt.close(fig)
 
+    # --- Plot 4: Cactus ---
+    fig, ax = plt.subplots(figsize=(16, 10))
+
+    plot_cactus(summary, TIMEOUT_SECONDS, ax)
+
+    ax.set_title('Solved Problems (Cactus Plot)', fontsize=F_TITLE, pad=20)
+    ax.set_ylabel('Wall Time per Problem (Seconds, Log Scale)',
+                  fontsize=F_AXIS_LABEL)
+    ax.set_xlabel('Problems Solved', fontsize=F_AXIS_LABEL)
+
+    ax.legend(loc='upper left', fontsize=F_LEGEND)
+
+    ax.grid(visible=True, which="both", linestyle="--", alpha=0.5)
+
+    ax.tick_params(axis='both', which='major', labelsize=F_TICKS)
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(RESULTS_DIR, 'benchmark_cactus.png'), dpi=100)
+    plt.close(fig)
+
     print("done! Charts saved to results folder.")
 
 
-def run_benchmark():
-    solvers = [f for f in os.listdir(SOLVERS_DIR) if not f.startswith('.')]
+def solver_hash(solver_name):
+    """Hash of the solver file, and of the arguments for a variant."""
+    file_name, args = resolve_solver(solver_name)
+    digest = file_hash(os.path.join(SOLVERS_DIR, file_name))
+    if args:
+        digest = hashlib.sha256(
+            " ".join([digest] + args).encode()).hexdigest()
+    return digest
+
+
+def solver_runtime(solver_name):
+    """Classifies a solver by the runtime it starts up in."""
+    solver_name, _ = resolve_solver(solver_name)
+    solver_path = os.path.join(SOLVERS_DIR, solver_name)
+
+    if solver_name.endswith(".py"):
+        with open(solver_path, errors="replace") as f:
+            return "python+pysat" if "pysat" in f.read() else "python"
+    elif solver_name.endswith(".ex") or solver_name.endswith(".exs"):
+        return "elixir"
+
+    with open(solver_path, "rb") as f:
+        first_line = f.readline(256)
+    if first_line.startswith(b"#!") and b"escript" in first_line:
+        return "escript"
+    return "native"
+
+
+def measure_startup_baselines(runtimes):
+    """Measures the median cost of a null solver for each runtime.
+
+    Returns {runtime: {"wall_sec": ..., "cpu_sec": ..., "memory_kb": ...}}.
+    Runtimes whose interpreter is not installed are left out.
+    """
+    baselines = {}
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".cnf") as empty_cnf, \
+            tempfile.NamedTemporaryFile(mode="w", suffix=".escript") as escript:
+        empty_cnf.write("p cnf 0 0\n")
+        empty_cnf.flush()
+        escript.write(NULL_ESCRIPT)
+        escript.flush()
+
+        for runtime in sorted(runtimes):
+            argv = [a.format(escript=escript.name)
+                    for a in STARTUP_BASELINES[runtime]]
+            try:
+                runs = [run_measured(argv, empty_cnf.name, TIMEOUT_SECONDS)
+                        for _ in range(STARTUP_BASELINE_RUNS)]
+            except OSError as e:
+                print(f"No startup baseline for {runtime}: {e}", flush=True)
+                continue
+            if any(r["exit_code"] != 0 or r["timed_out"] for r in runs):
+                print(f"No startup baseline for {runtime}: null solver failed",
+                      flush=True)
+                continue
+            baselines[runtime] = {
+                key: statistics.median(r[key] for r in runs)
+                for key in ("wall_sec", "cpu_sec", "memory_kb")
+            }
+            print(f"Startup baseline {runtime}: "
+                  f"{baselines[runtime]['wall_sec']:.3f}s wall, "
+                  f"{baselines[runtime]['cpu_sec']:.3f}s CPU, "
+                  f"{baselines[runtime]['memory_kb']} KB", flush=True)
+    return baselines
+
+
+def add_startup_adjusted(df, baselines):
+    """Adds *_adj columns: raw values minus the runtime's startup baseline.
+
+    Runs skipped on a predicted timeout were never measured, so their
+    adjusted values are left empty.
+    """
+    # Nullable, as skipped runs have no memory measurement
+    df["memory_kb"] = pd.to_numeric(df["memory_kb"]).round().astype("Int64")
+    skipped = df["note"] == SKIPPED_NOTE
+    for col, adj_col in (("wall_sec", "wall_adj_sec"),
+                         ("cpu_sec", "cpu_adj_sec"),
+                         ("memory_kb", "memory_adj_kb")):
+        baseline = df["runtime"].map(
+            {rt: b[col] for rt, b in baselines.items()}).fillna(0)
+        adjusted = (pd.to_numeric(df[col]) - baseline).clip(
+            lower=0).mask(skipped)
+        if col == "memory_kb":
+            adjusted = adjusted.round().astype("Int64")
+        df.insert(df.columns.get_loc(col) + 1, adj_col, adjusted.round(6))
+    return df
+
+
+def prepare_problem(prob_name, source, compress=False):
+    """Verifies a problem's DIMACS encoding and returns the path solvers
+    read it from, or None if it is invalid.
+
+    Problem files and generated instances are used in place, without a
+    copy: plain ones are passed to every solver as a read-only stdin,
+    compressed ones are decompressed while they are streamed to it.
+    """
+    print(f"\n--- Problem: {prob_name} ---", flush=True)
+
+    if isinstance(source, list):
+        print("Loading generated problem...", end=" ", flush=True)
+        path = generated_instance(source, compress)
+    else:
+        print("Loading problem file...", end=" ", flush=True)
+        path = source
+    print("done!", flush=True)
+
+    if not verify_dimacs(path):
+        print(
+            f"Problem {prob_name} could not be verified, skipping...", flush=True)
+        return None
+    return path
+
+
+def run_solver(solver_name, prob_name, cnf_path, formula, expected, trial=1,
+               cores=None):
+    """Runs one solver on one problem and returns its result row.
+
+    Trials numbered 0 or lower are warm-up runs. If cores, a queue of CPU
+    cores, is given, the solver is pinned to one of them so that parallel
+    runs do not compete for the same core; the core is given back as soon
+    as the solver has finished. With CHECK_PROOFS, a measured UNSAT answer
+    is repeated unmeasured to get a DRAT proof (see solver_proof), which
+    is then checked off the core; the checking time is recorded as
+    check_sec.
+    """
+    argv = solver_argv(solver_name)
+
+    try:
+        core = cores.get() if cores is not None else None
+        try:
+            res = run_measured(argv, cnf_path, TIMEOUT_SECONDS,
+                               memory_limit_mb=MEMORY_LIMIT_MB,
+                               memory_cgroups=MEMORY_CGROUPS,
+                               sample_interval=SAMPLE_INTERVAL_SECONDS,
+                               core=core)
+
+            try:
+                status, model = parse_output(
+                    res["stdout"], res["exit_code"], res["timed_out"])
+            except:
+                status = "ERROR"
+                model = None
+            if res["mem_out"]:
+                status, model = "MEMOUT", None
+
+            proof_data = solver_proof(argv, cnf_path, core) \
+                if CHECK_PROOFS and trial > 0 and status == "UNSAT" else None
+        finally:
+            if cores is not None:
+                cores.put(core)
+
+        if status == "ERROR":
+            print(f"[DEBUG] Stderr for {solver_name} on {prob_name}:\n{res['stderr']}"
+                  f"\n[DEBUG] Stdout for {solver_name} on {prob_name}:\n{res['stdout']}",
+                  flush=True)
+
+        proof, check_sec = check_unsat_proof(formula, proof_data) \
+            if status == "UNSAT" else (None, None)
+        is_correct, note = verify_correctness(
+            formula, status, model, expected, proof)
+
+        label = f"trial {trial}" if trial > 0 else "warm-up"
+        print(f"{prob_name} | {solver_name} ({label}): [{status}] "
+              f"{res['wall_sec']:.3f}s - {note}", flush=True)
+
+        return {
+            "solver": solver_name,
+            "runtime": solver_runtime(solver_name),
+            "problem": prob_name,
+            "trial": trial,
+            "status": status,
+            "wall_sec": round(res["wall_sec"], 6),
+            "cpu_sec": round(res["cpu_sec"], 6),
+            "sys_sec": round(res["sys_sec"], 6),
+            "memory_kb": res["memory_kb"],
+            "memory_limit_mb": MEMORY_LIMIT_MB,
+            "delivery_sec": round(res["delivery_sec"], 6),
+            "check_sec": None if check_sec is None else round(check_sec, 6),
+            "correct": is_correct,
+            "note": note,
+            **parse_stats(res["stdout"]),
+            "samples": res["samples"],
+        }
+    except Exception as e:
+        print(f"{prob_name} | {solver_name}: Failed: {e}", flush=True)
+        return None
+
+
+def run_tasks(tasks, jobs, on_result=None, order=None):
+    """Runs (solver, problem, cnf_path, formula, expected, trial) tasks on
+    `jobs` workers.
+
+    Every worker owns one CPU core while its solver runs. Tasks are
+    started in `order`, a list of task indices (default: task order).
+    Results are returned in task order, independent of start and
+    completion order, so a parallel run produces the same table as a
+    serial one. on_result is called with (task index, row) as soon as a
+    run has finished.
+    """
+    if order is None:
+        order = range(len(tasks))
+
+    # A serial run is pinned like a parallel one, so both measure the same
+    # processes
+    cores = queue.SimpleQueue()
+    for core in available_cores()[:max(jobs, 1)]:
+        cores.put(core)
+
+    def run(index):
+        row = run_solver(*tasks[index], cores=cores)
+        if row is not None and on_result is not None:
+            on_result(index, row)
+        return row
+
+    if jobs <= 1:
+        rows = {index: run(index) for index in order}
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            rows = dict(zip(order, executor.map(run, order)))
+    return [rows[index] for index in range(len(tasks))]
+
+
+def schedule(tasks, predictions):
+    """Longest-processing-time-first order of the tasks.
+
+    predictions holds each task's predicted wall time, None if unknown.
+    Unknown tasks count as running into the timeout, so they start early
+    rather than delaying the end of the benchmark. The sort is stable, so
+    the warm-up and measured trials of a pair stay together.
+    """
+    def seconds(index):
+        predicted = predictions[index]
+        return TIMEOUT_SECONDS if predicted is None else predicted
+    return sorted(range(len(tasks)), key=seconds, reverse=True)
+
+
+def run_benchmark(jobs=1, compress=False, repeat=1, warmup=0, resume=True):
+    solvers = list_solvers()
     if not solvers:
         print(f"No solvers found in {SOLVERS_DIR}.")
         return
 
     discover_static_problems()
 
+    cores = available_cores()
+    if jobs <= 0 or jobs > len(cores):
+        jobs = len(cores)
+
     print(f"Solvers: {solvers}", flush=True)
     print(f"Problems: {[p[0] for p in BENCHMARK_SUITE]}", flush=True)
     print(f"Timeout Limit: {TIMEOUT_SECONDS}s", flush=True)
-
-    results = []
-    print(f"Starting benchmark...", flush=True)
-
+    memory_limit = f"{MEMORY_LIMIT_MB} MB" if MEMORY_LIMIT_MB else "none"
+    print(f"Memory Limit: {memory_limit}", flush=True)
+    print(f"Parallel Jobs: {jobs}", flush=True)
+    print(f"Trials: {repeat} (+{warmup} warm-up)", flush=True)
+
+    print("\nMeasuring startup baselines...", flush=True)
+    baselines = measure_startup_baselines(
+        {solver_runtime(solver_name) for solver_name in solvers})
+
+    reference_cache = load_reference_cache()
+    feature_cache = load_cache(FEATURE_CACHE_FILE)
+    store = ResultStore(DB_FILE)
+    store.begin_run(TIMEOUT_SECONDS, {
+        "jobs": jobs, "repeat": repeat, "warmup": warmup, "resume": resume,
+        "memory_limit_mb": MEMORY_LIMIT_MB, "memory_cgroups": MEMORY_CGROUPS,
+        "check_proofs": CHECK_PROOFS, "proof_timeout": PROOF_TIMEOUT_SECONDS,
+        "skip_predicted_timeouts": SKIP_PREDICTED_TIMEOUTS})
+    machine = machine_id()
+    solver_hashes = {solver_name: solver_hash(solver_name)
+                     for solver_name in solvers}
+
+    # Measured trials in suite order; rows already in the store are
+    # reused, everything else goes into tasks
+    trials = []
+    tasks = []
+    task_keys = []
+    features = {}
     for prob_name, source, expected in BENCHMARK_SUITE:
-        print(f"\n--- Problem: {prob_name} ---", flush=True)
-
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.cnf') as tmp_cnf:
-            if isinstance(source, list):
-                print("Generating problem...", end=" ", flush=True)
-                subprocess.run(["cnfgen"] + source, stdout=tmp_cnf, check=True)
-                print("done!", flush=True)
-            else:
-                print("Loading problem file...", end=" ", flush=True)
-                shutil.copyfile(source, tmp_cnf.name)
-                print("done!", flush=True)
-
-            tmp_cnf.seek(0)
-
-            if not verify_dimacs(tmp_cnf.name):
-                print(
-                    f"Problem {prob_name} could not be verified, skipping...", flush=True)
+        cnf_path = prepare_problem(prob_name, source, compress)
+        if cnf_path is None:
+            continue
+        formula = Formula.from_file(cnf_path)
+        problem_hash = file_hash(cnf_path)
+        if expected == "UNKNOWN":
+            print("Computing reference result...", end=" ", flush=True)
+            expected, cached = reference_result(
+                reference_cache, prob_name, problem_hash, formula)
+            print(f"{expected} ({REFERENCE_SOLVER}"
+                  f"{', cached' if cached else ''})", flush=True)
+        features[prob_name] = instance_features(
+            feature_cache, problem_hash, formula)
+        for solver_name in solvers:
+            keys = [dict(zip(KEY_FIELDS, (solver_hashes[solver_name],
+                    problem_hash, TIMEOUT_SECONDS, machine, trial,
+                    MEMORY_LIMIT_MB)))
+                    for trial in range(1, repeat + 1)]
+            stored = [store.get(run_key(key)) if resume else None
+                      for key in keys]
+            trials += [(solver_name, prob_name, key, row)
+                       for key, row in zip(keys, stored)]
+            if all(row is not None for row in stored):
                 continue
-
-            for solver_name in solvers:
-                solver_path = os.path.join(SOLVERS_DIR, solver_name)
-
-                if solver_name.endswith(".py"):
-                    base_cmd = f"python3 {solver_path}"
-                elif solver_name.endswith(".ex") or solver_name.endswith(".exs"):
-                    base_cmd = f"elixir {solver_path}"
-                else:
-                    try:
-                        os.chmod(solver_path, 0o755)
-                    except OSError:
-                        pass
-                    base_cmd = f"{solver_path}"
-
-                cmd = f"cat {tmp_cnf.name} | /usr/bin/time -v timeout {TIMEOUT_SECONDS}s {base_cmd}"
-
-                print(f"Running {solver_name}...", end=" ", flush=True)
-                try:
-                    res = subprocess.run(
-                        cmd, shell=True, executable='/bin/bash', capture_output=True, text=True)
-
-                    try:
-                        mem, duration, cpu_time, status, model = parse_output(
-                            res.stdout, res.stderr, res.returncode)
-                    except:
-                        status = "ERROR"
-
-                    if status == "ERROR":
-                        print(f"\n[DEBUG] Stderr for {solver_name}:\n{res.stderr}"
-                              f"\n[DEBUG] Stdout for {solver_name}:\n{res.stdout}")
-
-                    is_correct, note = verify_correctness(
-                        tmp_cnf.name, status, model, expected)
-
-                    print(f"[{status}] {duration}s - {note}", flush=True)
-
-                    results.append({
-                        "solver": solver_name,
-                        "problem": prob_name,
-                        "status": status,
-                        "wall_sec": duration,
-                        "cpu_sec": cpu_time,
-                        "memory_kb": mem,
-                        "correct": is_correct,
-                        "note": note
-                    })
-                except Exception as e:
-                    print(f"Failed: {e}", flush=True)
+            for trial in range(1 - warmup, repeat + 1):
+                if trial > 0 and stored[trial - 1] is not None:
+                    continue
+                tasks.append((solver_name, prob_name, cnf_path,
+                              formula, expected, trial))
+                task_keys.append(keys[trial - 1] if trial > 0 else None)
+
+    save_cache(FEATURE_CACHE_FILE, feature_cache)
+
+    # Past results on this machine predict how long each run takes
+    model = RuntimeModel(store.timings(machine), feature_cache,
+                         TIMEOUT_SECONDS)
+    predictions = [model.predict(solver_hashes[task[0]], features[task[1]])
+                   for task in tasks]
+    skipped_keys = set()
+    if SKIP_PREDICTED_TIMEOUTS:
+        skipped = dict.fromkeys(task[:2] for task, (_, sure)
+                                in zip(tasks, predictions) if sure)
+        for solver_name, prob_name in skipped:
+            print(f"{prob_name} | {solver_name}: Skipped, predicted to "
+                  f"time out", flush=True)
+        kept = [i for i, (_, sure) in enumerate(predictions) if not sure]
+        skipped_keys = {run_key(key) for key, (_, sure)
+                        in zip(task_keys, predictions)
+                        if sure and key is not None}
+        tasks = [tasks[i] for i in kept]
+        task_keys = [task_keys[i] for i in kept]
+        predictions = [predictions[i] for i in kept]
+    predicted = [seconds for seconds, _ in predictions]
+    known = [seconds for seconds in predicted if seconds is not None]
+    print(f"Runtime model: {len(model)} past results, "
+          f"{len(known)}/{len(tasks)} runs predicted "
+          f"({sum(known):.1f}s), longest first", flush=True)
+
+    print(f"\nStarting benchmark ({len(tasks)} runs, "
+          f"{sum(row is not None for *_, row in trials)} "
+          f"reused from {DB_FILE})...", flush=True)
+
+    def save(index, row):
+        if task_keys[index] is not None:
+            row = dict(row)
+            samples = row.pop("samples")
+            store.append({**row, **task_keys[index]}, samples)
+
+    run_tasks(tasks, jobs, on_result=save, order=schedule(tasks, predicted))
+
+    # Stored rows keep the names they were measured under; report them
+    # under the current solver and problem names
+    results = []
+    for solver_name, prob_name, key, _ in trials:
+        row = store.get(run_key(key))
+        if row is None and run_key(key) in skipped_keys:
+            # Reported as a timeout, but not stored: the runtime model only
+            # learns from runs that really happened
+            row = {**key, "runtime": solver_runtime(solver_name),
+                   "status": "TIMEOUT", "wall_sec": TIMEOUT_SECONDS,
+                   "cpu_sec": None, "sys_sec": None, "memory_kb": None,
+                   "correct": False, "note": SKIPPED_NOTE}
+        if row is not None:
+            row = {k: v for k, v in row.items()
+                   if k in ("trial", "timeout_sec", "memory_limit_mb")
+                   or k not in KEY_FIELDS}
+            results.append({**row, "solver": solver_name, "problem": prob_name,
+                            "correct": bool(row["correct"])})
+    store.close()
 
     if results:
-        df = pd.DataFrame(results)
+        df = add_startup_adjusted(pd.DataFrame(results), baselines)
         df.to_csv(RESULTS_FILE, index=False)
-        print(f"\nSaved to {RESULTS_FILE}")
-        generate_plots(df)
+        summary = summarize_trials(df)
+        summary.to_csv(SUMMARY_FILE, index=False)
+        print(f"\nSaved to {RESULTS_FILE} and {SUMMARY_FILE}")
+        scores = par_scores(summary, TIMEOUT_SECONDS)
+        scores.to_csv(SCORES_FILE, index=False)
+        print(f"Saved to {SCORES_FILE}")
+        generate_plots(summary)
 
         print("\n--- Correctness Report ---")
-        report_cols = ["problem", "solver", "status", "correct",
-                       "wall_sec", "cpu_sec", "note"]
-        print(df[report_cols].set_index(["problem", "solver"]).to_string())
+        if repeat == 1:
+            report_cols = ["problem", "solver", "status", "correct",
+                           "wall_sec", "cpu_sec", "sys_sec", "note"]
+            print(df[report_cols].set_index(["problem", "solver"]).to_string())
+        else:
+            report_cols = ["problem", "solver", "status", "correct",
+                           "wall_sec_median", "wall_sec_iqr", "wall_sec_ci_low",
+                           "wall_sec_ci_high", "wall_sec_tied"]
+            print(summary[report_cols].set_index(
+                ["problem", "solver"]).to_string())
+
+        print(f"\n--- PAR-{PAR_FACTOR} Scores (timeout = {TIMEOUT_SECONDS}s) ---")
+        print(scores.set_index("solver").to_string(float_format="%.3f"))
     else:
         print("No results to save")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs the DPLL-Arena benchmark.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of solver runs to execute in parallel, each pinned to "
+             "its own CPU core (0 = one per available core, default: 1)")
+    parser.add_argument(
+        "--repeat", type=int, default=1, metavar="K",
+        help="number of measured trials per solver and problem (default: 1)")
+    parser.add_argument(
+        "--warmup", type=int, default=0, metavar="W",
+        help="number of unmeasured warm-up runs before the trials (default: 0)")
+    parser.add_argument(
+        "--no-resume", action="store_true",
+        help="measure every run again instead of reusing finished runs "
+             "from the result store")
+    parser.add_argument(
+        "--prewarm", action="store_true",
+        help="only generate the cnfgen instances of the suite into the "
+             "instance store and exit")
+    parser.add_argument(
+        "--compress", action="store_true",
+        help="gzip newly generated instances in the instance store")
+    parser.add_argument(
+        "--memory-limit-mb", type=int, default=MEMORY_LIMIT_MB, metavar="MB",
+        help=f"memory limit per solver run; runs beyond it end as MEMOUT "
+             f"(0 = none, default: {MEMORY_LIMIT_MB})")
+    parser.add_argument(
+        "--memory-cgroups", action="store_true",
+        help="enforce the memory limit with a cgroup v2 per run instead of "
+             "an rlimit; moves the runner into a cgroup 'arena-runner'")
+    parser.add_argument(
+        "--sample-interval", type=float, default=SAMPLE_INTERVAL_SECONDS,
+        metavar="SEC",
+        help=f"seconds between two samples of a run's CPU time and memory "
+             f"(0 = no sampling, default: {SAMPLE_INTERVAL_SECONDS})")
+    parser.add_argument(
+        "--check-proofs", action="store_true",
+        help="repeat UNSAT answers unmeasured with proof logging and check "
+             "their DRAT proofs")
+    parser.add_argument(
+        "--proof-timeout", type=float, default=PROOF_TIMEOUT_SECONDS,
+        metavar="SEC",
+        help=f"seconds before a proof check is given up "
+             f"(default: {PROOF_TIMEOUT_SECONDS})")
+    parser.add_argument(
+        "--skip-predicted-timeouts", action="store_true",
+        help="leave out solver/problem pairs that timed out on all of the "
+             "most similar problems in past runs")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    run_benchmark()
+    args = parse_args()
+    MEMORY_LIMIT_MB = max(args.memory_limit_mb, 0)
+    SAMPLE_INTERVAL_SECONDS = max(args.sample_interval, 0)
+    MEMORY_CGROUPS = args.memory_cgroups
+    CHECK_PROOFS = args.check_proofs
+    PROOF_TIMEOUT_SECONDS = args.proof_timeout
+    SKIP_PREDICTED_TIMEOUTS = args.skip_predicted_timeouts
+    if args.prewarm:
+        prewarm_instances(compress=args.compress)
+    else:
+        run_benchmark(jobs=args.jobs, compress=args.compress,
+                      repeat=max(args.repeat, 1), warmup=max(args.warmup, 0),
+                      resume=not args.no_resume)
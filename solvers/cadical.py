@@ -1,15 +1,48 @@
 #!/usr/bin/env python3
+import ctypes
+import os
 import sys
-from pysat.solvers import Cadical195
+from pysat.solvers import Cadical195, pysolvers
 from pysat.formula import CNF
 
-input_data = sys.stdin.read()
-cnf = CNF(from_string=input_data)
 
-with Cadical195(bootstrap_with=cnf) as c:
-    if c.solve():
-        print("s SATISFIABLE")
-    else:
-        print("s UNSATISFIABLE")
-    if c.get_model() is not None:
-        print("v " + " ".join([str(l) for l in c.get_model()]))
+def solve(input_data, proof_path=None):
+    cnf = CNF(from_string=input_data)
+    lines = []
+
+    with Cadical195() as c:
+        if proof_path:
+            # Binary DRAT, traced from the start. pysat's own proof support
+            # loses the part of the proof that is still buffered, so
+            # CaDiCaL writes to the file directly
+            fd = os.open(proof_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            pysolvers.cadical195_tracepr(c.cadical, fd)
+        c.append_formula(cnf)
+        if c.solve():
+            lines.append("s SATISFIABLE")
+        else:
+            lines.append("s UNSATISFIABLE")
+        if c.get_model() is not None:
+            lines.append("v " + " ".join([str(l) for l in c.get_model()]))
+        # Search statistics as "c stat <name> <value>" lines
+        lines.extend(f"c stat {name} {value}"
+                     for name, value in c.accum_stats().items())
+    if proof_path:
+        # The proof file is a C stdio stream that is never closed
+        ctypes.CDLL(None).fflush(None)
+
+    return "\n".join(lines) + "\n"
+
+
+# Persistent worker (ARENA_WORKER is set by batch.py): every problem and
+# every answer is a frame "<length in bytes>\n<payload>"
+if os.environ.get("ARENA_WORKER"):
+    while header := sys.stdin.buffer.readline():
+        input_data = sys.stdin.buffer.read(int(header)).decode()
+        answer = solve(input_data).encode()
+        sys.stdout.buffer.write(b"%d\n" % len(answer) + answer)
+        sys.stdout.buffer.flush()
+else:
+    # ARENA_PROOF names the file for a DRAT proof. runner.py only sets it
+    # for an unmeasured rerun of UNSAT answers (--check-proofs).
+    sys.stdout.write(solve(sys.stdin.read(), os.environ.get("ARENA_PROOF")))
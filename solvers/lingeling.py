@@ -1,15 +1,41 @@
 #!/usr/bin/env python3
+import os
 import sys
 from pysat.solvers import Lingeling
 from pysat.formula import CNF
 
-input_data = sys.stdin.read()
-cnf = CNF(from_string=input_data)
 
-with Lingeling(bootstrap_with=cnf) as l:
-    if l.solve():
-        print("s SATISFIABLE")
-    else:
-        print("s UNSATISFIABLE")
-    if l.get_model() is not None:
-        print("v " + " ".join([str(lit) for lit in l.get_model()]))
+def solve(input_data, proof_path=None):
+    cnf = CNF(from_string=input_data)
+    lines = []
+
+    with Lingeling(bootstrap_with=cnf, with_proof=bool(proof_path)) as l:
+        if l.solve():
+            lines.append("s SATISFIABLE")
+        else:
+            lines.append("s UNSATISFIABLE")
+            if proof_path:
+                # Text DRAT, one lemma or deletion per line
+                with open(proof_path, "w") as f:
+                    f.writelines(line + "\n" for line in l.get_proof())
+        if l.get_model() is not None:
+            lines.append("v " + " ".join([str(lit) for lit in l.get_model()]))
+        # Search statistics as "c stat <name> <value>" lines
+        lines.extend(f"c stat {name} {value}"
+                     for name, value in l.accum_stats().items())
+
+    return "\n".join(lines) + "\n"
+
+
+# Persistent worker (ARENA_WORKER is set by batch.py): every problem and
+# every answer is a frame "<length in bytes>\n<payload>"
+if os.environ.get("ARENA_WORKER"):
+    while header := sys.stdin.buffer.readline():
+        input_data = sys.stdin.buffer.read(int(header)).decode()
+        answer = solve(input_data).encode()
+        sys.stdout.buffer.write(b"%d\n" % len(answer) + answer)
+        sys.stdout.buffer.flush()
+else:
+    # ARENA_PROOF names the file for a DRAT proof. runner.py only sets it
+    # for an unmeasured rerun of UNSAT answers (--check-proofs).
+    sys.stdout.write(solve(sys.stdin.read(), os.environ.get("ARENA_PROOF")))
@@ -1,15 +1,35 @@
 #!/usr/bin/env python3
+import os
 import sys
 from pysat.solvers import Minisat22
 from pysat.formula import CNF
 
-input_data = sys.stdin.read()
-cnf = CNF(from_string=input_data)
 
-with Minisat22(bootstrap_with=cnf) as m:
-    if m.solve():
-        print("s SATISFIABLE")
-    else:
-        print("s UNSATISFIABLE")
-    if m.get_model() is not None:
-        print("v " + " ".join([str(l) for l in m.get_model()]))
+def solve(input_data):
+    cnf = CNF(from_string=input_data)
+    lines = []
+
+    with Minisat22(bootstrap_with=cnf) as m:
+        if m.solve():
+            lines.append("s SATISFIABLE")
+        else:
+            lines.append("s UNSATISFIABLE")
+        if m.get_model() is not None:
+            lines.append("v " + " ".join([str(l) for l in m.get_model()]))
+        # Search statistics as "c stat <name> <value>" lines
+        lines.extend(f"c stat {name} {value}"
+                     for name, value in m.accum_stats().items())
+
+    return "\n".join(lines) + "\n"
+
+
+# Persistent worker (ARENA_WORKER is set by batch.py): every problem and
+# every answer is a frame "<length in bytes>\n<payload>"
+if os.environ.get("ARENA_WORKER"):
+    while header := sys.stdin.buffer.readline():
+        input_data = sys.stdin.buffer.read(int(header)).decode()
+        answer = solve(input_data).encode()
+        sys.stdout.buffer.write(b"%d\n" % len(answer) + answer)
+        sys.stdout.buffer.flush()
+else:
+    sys.stdout.write(solve(sys.stdin.read()))
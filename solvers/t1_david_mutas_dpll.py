@@ -1,10 +1,10 @@
+import argparse
+import os
+import re
 import sys
-from typing import Set, FrozenSet, Tuple, Dict
+from typing import Dict, List, Optional, TextIO, Tuple
 
-Clause = FrozenSet[int]
-Formula = Set[Clause]
-
-Assignment = Dict[int, bool]
+Clause = List[int]
 
 
 # Extrahiert die Variable aus einem Literal
@@ -19,241 +19,799 @@ def neg(lit: int) -> int:
     return -lit
 
 
-# Prüft ob die Formel gelöst ist (keine Klauseln mehr übrig)
-def _is_solved(formula: Formula) -> bool:
-    return len(formula) == 0
-
-
-# Wendet Zuweisung eines Literals auf gesamte Formel an
-def _assign_literal(formula: Formula, lit: int) -> Tuple[Formula, bool]:
-    new_formula: Formula = set()
-
-    for clause in formula:
-        # 1) Klausel enthält Literal --> Klausel ist wahr, fertig
-        if lit in clause:
-            continue
-
-        # 2) Klausel enthält Negation des Literals --> Aus Klausel entfernen
-        if neg(lit) in clause:
-            new_clause = set()
-            for l in clause:
-                if l != neg(lit):
-                    new_clause.add(l)
-            new_clause = frozenset(new_clause)
-            
-            # 2a) Entfernen bildet leere Klausel --> Konflikt
-            if len(new_clause) == 0:
-                return set(), True
-            
-            new_formula.add(new_clause)
-            continue
-
-        # 3) Literal nicht in Klausel vorhanden, keine Änderungen an Klausel vornehmen
-        new_formula.add(clause)
-
-    # Kein Konflikt entstanden
-    return new_formula, False
-
-# Finde alle Klauseln mit genau einem Literal, setze das Literal auf TRUE
-def _unit_propagate(formula: Formula, assignment: Assignment) -> Tuple[Formula, Assignment, bool]:
-    formula = set(formula)
-    assignment = dict(assignment)
-
-    while True:
-        # Finde alle Unit-Klauseln (Klauseln mit genau einem Literal)
-        unit_literals = []
-        for clause in formula:
-            if len(clause) == 1:
+# Wahrheitswerte der Literale
+TRUE = 1
+FALSE = -1
+UNASSIGNED = 0
+
+# Grund einer Zuweisung ohne Klausel (Entscheidung, Unit-Klausel, Pure Literal)
+NO_REASON = -1
+
+# CDCL: Anfangsgröße der Datenbank gelernter Klauseln und ihr Wachstum
+# nach jeder Reduktion
+MIN_LEARNTS = 2000
+LEARNTS_GROWTH = 1.1
+
+# VSIDS: Aktivitäten verfallen nach jedem Konflikt um diesen Faktor
+VSIDS_DECAY = 0.95
+# MOMS: Gewichtung der Summe gegenüber dem Produkt der Vorkommen
+MOMS_K = 1
+
+
+class Solver:
+    """DPLL mit Two-Watched-Literals und Trail, optional mit Klausellernen
+    (CDCL).
+
+    Alle Klauseln liegen hintereinander in einer flachen Liste `lits`,
+    Klausel c belegt lits[starts[c]:starts[c + 1]]. Die ersten beiden
+    Literale jeder Klausel (mit mindestens zwei Literalen) sind beobachtet.
+
+    Listen, die über Literale indiziert sind (`value`, `watches`), haben
+    die Länge 2 * num_vars + 1: ein negatives Literal -v landet über
+    Pythons negative Indizes auf Position 2 * num_vars + 1 - v und
+    kollidiert so mit keinem positiven Literal.
+
+    Gelernte Klauseln werden hinter den Klauseln der Formel angehängt;
+    Klauseln ab Index `num_original` sind gelernt.
+
+    Mit `proof` schreibt der Solver einen DRAT-Beweis im Textformat: jede
+    gelernte Klausel als Zeile, gelöschte Klauseln mit "d" davor und bei
+    UNSAT zum Schluss die leere Klausel "0".
+    """
+
+    def __init__(self, num_vars: int, clauses: List[Clause],
+                 heuristic: str = "first", phase_saving: bool = False,
+                 proof: Optional[TextIO] = None):
+        self.num_vars = num_vars
+        self.proof = proof
+        size = 2 * num_vars + 1
+        # value[lit]: TRUE, FALSE oder UNASSIGNED
+        self.value = [UNASSIGNED] * size
+        # watches[lit]: Klauseln, in denen lit beobachtet wird
+        self.watches: List[List[int]] = [[] for _ in range(size)]
+        # Alle zugewiesenen Literale in Zuweisungsreihenfolge
+        self.trail: List[int] = []
+        # Position im Trail, ab der noch propagiert werden muss
+        self.qhead = 0
+        self.lits: List[int] = []
+        self.starts: List[int] = [0]
+        self.units: List[int] = []
+        self.empty_clause = False
+        # Variablen, die in der Formel vorkommen
+        self.occurring = [False] * (num_vars + 1)
+        # Pro Variable: Entscheidungsebene und Grund-Klausel der Zuweisung
+        self.level = [0] * (num_vars + 1)
+        self.reason = [NO_REASON] * (num_vars + 1)
+        # Trail-Positionen, an denen die Entscheidungsebenen beginnen
+        self.trail_lim: List[int] = []
+        # Statistik: Entscheidungen, Konflikte und propagierte Literale
+        self.decisions = 0
+        self.conflicts = 0
+        self.propagations = 0
+
+        for clause in clauses:
+            self._add_clause(clause)
+
+        self.num_original = len(self.starts) - 1
+        # LBD (Anzahl verschiedener Ebenen) der gelernten Klauseln
+        self.lbd: List[int] = []
+        self.max_learnts = max(MIN_LEARNTS, self.num_original // 3)
+
+        self.heuristic = HEURISTICS[heuristic](self)
+        # Phase Saving: letzter Wert jeder Variable (None = noch nie belegt)
+        self.saved_phase: Optional[List[Optional[bool]]] = \
+            [None] * (num_vars + 1) if phase_saving else None
+
+    # Fügt eine Klausel hinzu; doppelte Literale werden entfernt,
+    # Tautologien übersprungen. Ihre Variablen kommen trotzdem vor und
+    # müssen belegt und ausgegeben werden.
+    def _add_clause(self, clause: Clause) -> None:
+        clause = list(dict.fromkeys(clause))
+        for lit in clause:
+            self.occurring[var(lit)] = True
+        if any(neg(lit) in clause for lit in clause):
+            return
+
+        if len(clause) == 0:
+            self.empty_clause = True
+            return
+        if len(clause) == 1:
+            self.units.append(clause[0])
+            return
+
+        self._attach(clause)
+
+    # Schreibt eine Klausel (bzw. ihre Löschung) in den DRAT-Beweis
+    def _emit(self, clause: Clause, delete: bool = False) -> None:
+        if self.proof is not None:
+            self.proof.write(("d " if delete else "") +
+                             "".join(f"{lit} " for lit in clause) + "0\n")
+
+    # Speichert eine Klausel und beobachtet ihre ersten beiden Literale
+    def _attach(self, clause: Clause) -> int:
+        index = len(self.starts) - 1
+        self.lits.extend(clause)
+        self.starts.append(len(self.lits))
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    # Setzt ein Literal auf TRUE und legt es auf den Trail
+    # (var() und neg() sind in den heißen Pfaden ausgeschrieben, das spart
+    # pro Zuweisung mehrere Funktionsaufrufe)
+    def _assign(self, lit: int, reason: int = NO_REASON) -> None:
+        v = lit if lit > 0 else -lit
+        self.value[lit] = TRUE
+        self.value[-lit] = FALSE
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    # Nimmt alle Zuweisungen ab Position `size` im Trail zurück
+    def _backtrack(self, size: int) -> None:
+        value = self.value
+        trail = self.trail
+        saved_phase = self.saved_phase
+        unassigned = self.heuristic.unassigned
+        for k in range(len(trail) - 1, size - 1, -1):
+            lit = trail[k]
+            v = lit if lit > 0 else -lit
+            value[lit] = UNASSIGNED
+            value[-lit] = UNASSIGNED
+            if saved_phase is not None:
+                saved_phase[v] = lit > 0
+            unassigned(v)
+        del trail[size:]
+        self.qhead = size
+
+    # Unit Propagation über die beobachteten Literale
+    # Gibt die Konfliktklausel zurück oder None
+    def _propagate(self) -> Optional[int]:
+        value = self.value
+        watches = self.watches
+        lits = self.lits
+        starts = self.starts
+        trail = self.trail
+        level = self.level
+        reason = self.reason
+        current_level = len(self.trail_lim)
+        qhead = self.qhead
+
+        while qhead < len(trail):
+            # Literal ist FALSE geworden: nur Klauseln, die es beobachten,
+            # können jetzt Unit oder Konflikt sein
+            false_lit = -trail[qhead]
+            qhead += 1
+            watch_list = watches[false_lit]
+            i = j = 0
+            n = len(watch_list)
+            while i < n:
+                c = watch_list[i]
+                i += 1
+                start = starts[c]
+                # Das FALSE-Literal an Position 1 bringen
+                if lits[start] == false_lit:
+                    lits[start] = lits[start + 1]
+                    lits[start + 1] = false_lit
+                first = lits[start]
+
+                # 1) Anderes beobachtetes Literal ist TRUE --> Klausel erfüllt
+                if value[first] == TRUE:
+                    watch_list[j] = c
+                    j += 1
+                    continue
+
+                # 2) Neues nicht-FALSE Literal zum Beobachten suchen
+                for k in range(start + 2, starts[c + 1]):
+                    lit = lits[k]
+                    if value[lit] != FALSE:
+                        lits[start + 1] = lit
+                        lits[k] = false_lit
+                        watches[lit].append(c)
+                        break
+                else:
+                    watch_list[j] = c
+                    j += 1
+                    # 3) Kein Ersatz und erstes Literal FALSE --> Konflikt
+                    if value[first] == FALSE:
+                        while i < n:
+                            watch_list[j] = watch_list[i]
+                            i += 1
+                            j += 1
+                        del watch_list[j:]
+                        self.propagations += qhead - self.qhead
+                        self.qhead = qhead
+                        return c
+                    # 4) Kein Ersatz --> Klausel ist Unit, erstes Literal setzen
+                    value[first] = TRUE
+                    value[-first] = FALSE
+                    v = first if first > 0 else -first
+                    level[v] = current_level
+                    reason[v] = c
+                    trail.append(first)
+            del watch_list[j:]
+
+        self.propagations += qhead - self.qhead
+        self.qhead = qhead
+
+        return None
+
+    # Findet alle Pure Literals der Ausgangsformel und weist sie zu
+    def _pure_literal_elimination(self) -> None:
+        value = self.value
+        while True:
+            occurs = [False] * len(value)
+            for c in range(len(self.starts) - 1):
+                clause = self.lits[self.starts[c]:self.starts[c + 1]]
+                # Erfüllte Klauseln zählen nicht
+                if any(value[lit] == TRUE for lit in clause):
+                    continue
                 for lit in clause:
-                    unit_literals.append(lit)
+                    if value[lit] == UNASSIGNED:
+                        occurs[lit] = True
+
+            pure_literals = [lit for v in range(1, self.num_vars + 1)
+                             for lit in (v, neg(v))
+                             if occurs[lit] and not occurs[neg(lit)]]
+            if len(pure_literals) == 0:
+                break
+            # Pure Literals können keinen Konflikt verursachen; im Beweis
+            # sind sie RAT-Unit-Klauseln
+            for lit in pure_literals:
+                self._emit([lit])
+                self._assign(lit)
+
+    # Liefert für jede noch nicht erfüllte Klausel der Ausgangsformel ihre
+    # unzugewiesenen Literale (für die Heuristiken)
+    def open_clauses(self):
+        value = self.value
+        lits = self.lits
+        starts = self.starts
+        for c in range(self.num_original):
+            free = []
+            for k in range(starts[c], starts[c + 1]):
+                lit = lits[k]
+                if value[lit] == TRUE:
+                    break
+                if value[lit] == UNASSIGNED:
+                    free.append(lit)
+            else:
+                yield free
+
+    # Wählt das nächste Entscheidungsliteral (0 = keine Variable mehr frei)
+    def _decide(self) -> int:
+        lit = self.heuristic.choose()
+        if lit != 0 and self.saved_phase is not None:
+            phase = self.saved_phase[var(lit)]
+            if phase is not None:
+                lit = var(lit) if phase else neg(var(lit))
+        return lit
+
+    # DPLL Algorithmus - Hauptfunktion
+    # Gibt zurück, ob die Formel unter dem aktuellen Trail erfüllbar ist
+    def dpll(self) -> bool:
+        # Entscheidungsstapel statt Rekursion: pro offener Entscheidung die
+        # Trail-Länge davor und das gesetzte Literal, und ob es schon der
+        # zweite Zweig ist
+        stack: List[Tuple[int, int, bool]] = []
+        trail = self.trail
+
+        while True:
+            # 1) Unit Propagation
+            conflict = self._propagate()
+            if conflict is None:
+                # 2) Keine Variable mehr frei --> alle Klauseln erfüllt
+                decision = self._decide()
+                if decision == 0:
+                    return True
+
+                # 3) Split: erst die von der Heuristik gewählte Polarität
+                stack.append((len(trail), decision, False))
+                self.decisions += 1
+                self._assign(decision)
+                continue
 
-        if len(unit_literals) == 0:
-            break
+            self.conflicts += 1
+            self.heuristic.bump(var(lit) for lit in self.clause(conflict))
+            self.heuristic.decay()
+            # Beweis: die ersten Zweige auf dem Stapel schließen sich aus
+            # (die zweiten Zweige folgen aus früheren Klauseln)
+            if self.proof is not None:
+                self._emit([neg(lit) for _, lit, second in stack
+                            if not second])
+
+            # 4) Zweig gescheitert --> zur letzten Entscheidung zurück, deren
+            # zweiter Zweig noch offen ist, und die andere Polarität setzen
+            while len(stack) > 0:
+                size, lit, second = stack.pop()
+                self._backtrack(size)
+                if not second:
+                    stack.append((size, neg(lit), True))
+                    self._assign(neg(lit))
+                    break
+            else:
+                # 5) Alle Splits gescheitert --> UNSAT
+                return False
+
+    def clause(self, c: int) -> Clause:
+        return self.lits[self.starts[c]:self.starts[c + 1]]
+
+    # Konfliktanalyse nach dem 1-UIP-Schema
+    # Gibt (gelernte Klausel, Rücksprungebene) zurück; das erste Literal der
+    # Klausel ist nach dem Rücksprung Unit
+    def _analyze(self, conflict: int) -> Tuple[Clause, int]:
+        lits = self.lits
+        starts = self.starts
+        level = self.level
+        trail = self.trail
+        current_level = len(self.trail_lim)
+        seen = [False] * (self.num_vars + 1)
+        bumped = []  # alle an der Analyse beteiligten Variablen
+
+        learnt: Clause = [0]  # Platz für das UIP-Literal
+        pending = 0  # markierte Literale der aktuellen Ebene
+        lit = 0
+        index = len(trail) - 1
+        c = conflict
+        while True:
+            # Resolution mit der Klausel c
+            for k in range(starts[c], starts[c + 1]):
+                q = lits[k]
+                v = var(q)
+                if q == lit or seen[v] or level[v] == 0:
+                    continue
+                seen[v] = True
+                bumped.append(v)
+                if level[v] == current_level:
+                    pending += 1
+                else:
+                    learnt.append(q)
+
+            # Nächstes markiertes Literal auf dem Trail (rückwärts)
+            while not seen[var(trail[index])]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            seen[var(lit)] = False
+            pending -= 1
+            # Nur noch ein Literal der aktuellen Ebene --> 1-UIP gefunden
+            if pending == 0:
+                break
+            c = self.reason[var(lit)]
+        learnt[0] = neg(lit)
+        self.heuristic.bump(bumped)
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Literal mit der höchsten Ebene an Position 1 (wird beobachtet)
+        k = max(range(1, len(learnt)), key=lambda k: level[var(learnt[k])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, level[var(learnt[1])]
+
+    # Nimmt alle Entscheidungsebenen oberhalb von `target_level` zurück
+    def _backjump(self, target_level: int) -> None:
+        if target_level < len(self.trail_lim):
+            self._backtrack(self.trail_lim[target_level])
+            del self.trail_lim[target_level:]
+
+    # Löscht die schlechtere Hälfte der gelernten Klauseln (nach LBD)
+    def _reduce_db(self) -> None:
+        lits = self.lits
+        starts = self.starts
+        first = self.num_original
+
+        # Klauseln, die Grund einer Zuweisung sind, werden behalten
+        locked = {self.reason[var(lit)] for lit in self.trail}
+        candidates = sorted(
+            (c for c in range(first, len(starts) - 1)
+             if c not in locked and self.lbd[c - first] > 2),
+            key=lambda c: self.lbd[c - first], reverse=True)
+        removed = set(candidates[:len(candidates) // 2])
+        for c in removed:
+            self._emit(self.clause(c), delete=True)
+
+        # Klauseln neu anordnen und Watches neu aufbauen
+        new_lits = lits[:starts[first]]
+        new_starts = starts[:first + 1]
+        new_lbd = []
+        new_index = {}
+        for c in range(first, len(starts) - 1):
+            if c in removed:
+                continue
+            new_index[c] = len(new_starts) - 1
+            new_lits.extend(lits[starts[c]:starts[c + 1]])
+            new_starts.append(len(new_lits))
+            new_lbd.append(self.lbd[c - first])
+        self.lits, self.starts, self.lbd = new_lits, new_starts, new_lbd
+
+        for lit in self.trail:
+            c = self.reason[var(lit)]
+            if c >= first:
+                self.reason[var(lit)] = new_index[c]
+        for watch_list in self.watches:
+            watch_list.clear()
+        for c in range(len(new_starts) - 1):
+            self.watches[new_lits[new_starts[c]]].append(c)
+            self.watches[new_lits[new_starts[c] + 1]].append(c)
+
+        self.max_learnts = int(self.max_learnts * LEARNTS_GROWTH)
+
+    # CDCL Algorithmus: Konflikte analysieren, Klauseln lernen und
+    # nicht-chronologisch zurückspringen
+    def cdcl(self) -> bool:
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                # Konflikt auf Ebene 0 --> UNSAT
+                if len(self.trail_lim) == 0:
+                    self._emit([])
+                    return False
+                learnt, target_level = self._analyze(conflict)
+                self._emit(learnt)
+                self.heuristic.decay()
+                self._backjump(target_level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0])
+                    continue
+                self.lbd.append(len({self.level[var(lit)] for lit in learnt}))
+                self._assign(learnt[0], self._attach(learnt))
+                if len(self.lbd) >= self.max_learnts:
+                    self._reduce_db()
+                continue
 
-        for lit in unit_literals:
-            v = var(lit)
-            v_sign = (lit > 0)
+            # Keine Variable mehr frei --> alle Klauseln erfüllt
+            decision = self._decide()
+            if decision == 0:
+                return True
+            # Neue Entscheidungsebene
+            self.trail_lim.append(len(self.trail))
+            self.decisions += 1
+            self._assign(decision)
+
+    # Zähler für die Ausgabe als "c stat <Name> <Wert>"
+    def stats(self) -> Dict[str, int]:
+        return {
+            "decisions": self.decisions,
+            "conflicts": self.conflicts,
+            "propagations": self.propagations,
+        }
+
+    # Löst die Formel, gibt (erfüllbar, Belegung als Literale) zurück
+    def solve(self, cdcl: bool = False) -> Tuple[bool, List[int]]:
+        if self.empty_clause:
+            self._emit([])
+            return False, []
+
+        # Unit-Klauseln der Ausgangsformel zuweisen
+        for lit in self.units:
+            if self.value[lit] == FALSE:
+                self._emit([])
+                return False, []
+            if self.value[lit] == UNASSIGNED:
+                self._assign(lit)
+        if self._propagate() is not None:
+            self._emit([])
+            return False, []
+
+        self._pure_literal_elimination()
+
+        if cdcl:
+            if not self.cdcl():
+                return False, []
+            return True, sorted(self.trail, key=var)
+
+        if not self.dpll():
+            return False, []
+        return True, sorted(self.trail, key=var)
+
+
+class Heuristic:
+    """Entscheidungsheuristik: wählt das nächste Entscheidungsliteral.
+
+    choose() gibt ein unzugewiesenes Literal zurück, dessen Polarität
+    zuerst versucht wird, oder 0, wenn alle Variablen belegt sind.
+    Aktivitätsbasierte Heuristiken werden zusätzlich über Konflikte
+    (bump, decay) und zurückgenommene Zuweisungen (unassigned)
+    informiert.
+    """
+
+    def __init__(self, solver: Solver):
+        self.solver = solver
+
+    def choose(self) -> int:
+        raise NotImplementedError
+
+    def bump(self, variables) -> None:
+        pass
+
+    def decay(self) -> None:
+        pass
+
+    def unassigned(self, v: int) -> None:
+        pass
+
+    # Erste unzugewiesene Variable ab `first`, die in der Formel vorkommt
+    def _first_unassigned(self, first: int = 1) -> int:
+        value = self.solver.value
+        occurring = self.solver.occurring
+        for v in range(first, self.solver.num_vars + 1):
+            if occurring[v] and value[v] == UNASSIGNED:
+                return v
+        return 0
 
-            if v in assignment:
-                # Assignment ist inkonsistent --> Konflikt
-                if assignment[v] != v_sign:
-                    return set(), {}, True
-                # Assignment ist konsistent --> fertig, nächstes Literal überprüfen
-                continue
-            # Literal noch nicht assigned --> wird mit v_sign assigned
-            assignment[v] = v_sign
-            formula, conflict = _assign_literal(formula, lit)
-            if conflict:
-                return set(), {}, True
-
-            # nach Literal-Assignment wird von vorne überprüft
-            break
-        else:
-            # For-loop endet ohne eine neue Zuweisung eines Literals. Unit propagation beendet
-            break
-
-    return formula, assignment, False
-
-
-# Findet alle Pure Literals und weist sie zu
-def _pure_literal_elimination(formula: Formula, assignment: Assignment) -> Tuple[Formula, Assignment]:
-    formula = set(formula)
-    assignment = dict(assignment)
-    
-    while True:
-        # Sammle alle Literale in der Formel
-        positive_literals = set()  # Variablen die positiv vorkommen
-        negative_literals = set()  # Variablen die negativ vorkommen
-        
-        for clause in formula:
+
+class FirstUnassigned(Heuristic):
+    """Erste freie Variable in Variablenreihenfolge, positiv zuerst.
+
+    Alle Variablen vor `next_var` sind belegt, die Suche beginnt also
+    dort; nur zurückgenommene Zuweisungen setzen `next_var` zurück.
+    """
+
+    def __init__(self, solver: Solver):
+        super().__init__(solver)
+        self.next_var = 1
+
+    def choose(self) -> int:
+        v = self._first_unassigned(self.next_var)
+        self.next_var = v if v != 0 else self.solver.num_vars + 1
+        return v
+
+    def unassigned(self, v: int) -> None:
+        if v < self.next_var:
+            self.next_var = v
+
+
+class DLIS(Heuristic):
+    """Dynamic Largest Individual Sum: das Literal, das in den meisten
+    nicht erfüllten Klauseln vorkommt."""
+
+    def choose(self) -> int:
+        counts: Dict[int, int] = {}
+        for clause in self.solver.open_clauses():
             for lit in clause:
-                v = var(lit)
-                if lit > 0:
-                    positive_literals.add(v)
-                else:
-                    negative_literals.add(v)
-        
-        # Finde Pure Literals
-        pure_literals = []
-        
-        # Variablen die NUR positiv vorkommen
-        for v in positive_literals:
-            if v not in negative_literals and v not in assignment:
-                pure_literals.append(v)  # Positives Literal
-        
-        # Variablen die NUR negativ vorkommen
-        for v in negative_literals:
-            if v not in positive_literals and v not in assignment:
-                pure_literals.append(neg(v))  # Negatives Literal
-        
-        if len(pure_literals) == 0:
-            break
-        
-        # Weise alle Pure Literals zu
-        for lit in pure_literals:
-            v = var(lit)
-            v_sign = (lit > 0)
-            assignment[v] = v_sign
-            formula, _ = _assign_literal(formula, lit)  # Kann keinen Konflikt verursachen
-    
-    return formula, assignment
-
-
-# Wählt eine unzugewiesene Variable aus der Formel
-def _choose_variable(formula: Formula, assignment: Assignment) -> int:
-    for clause in formula:
-        for lit in clause:
-            v = var(lit)
-            if v not in assignment:
+                counts[lit] = counts.get(lit, 0) + 1
+        if len(counts) == 0:
+            return self._first_unassigned()
+        return max(counts, key=counts.get)
+
+
+class MOMS(Heuristic):
+    """Maximum Occurrences in clauses of Minimum Size: die Variable, die in
+    den kürzesten nicht erfüllten Klauseln am häufigsten vorkommt, mit
+    Bewertung (f(x) + f(-x)) * 2^k + f(x) * f(-x)."""
+
+    def choose(self) -> int:
+        min_size = 0
+        counts: Dict[int, int] = {}
+        for clause in self.solver.open_clauses():
+            if min_size == 0 or len(clause) < min_size:
+                min_size = len(clause)
+                counts = {}
+            if len(clause) == min_size:
+                for lit in clause:
+                    counts[lit] = counts.get(lit, 0) + 1
+        if len(counts) == 0:
+            return self._first_unassigned()
+
+        def score(v: int) -> int:
+            pos, negative = counts.get(v, 0), counts.get(neg(v), 0)
+            return (pos + negative) * 2 ** MOMS_K + pos * negative
+
+        v = max({var(lit) for lit in counts}, key=score)
+        return v if counts.get(v, 0) >= counts.get(neg(v), 0) else neg(v)
+
+
+class JeroslowWang(Heuristic):
+    """Jeroslow-Wang (einseitig): das Literal mit der größten Summe von
+    2^-|C| über die nicht erfüllten Klauseln C, in denen es vorkommt."""
+
+    def choose(self) -> int:
+        scores: Dict[int, float] = {}
+        for clause in self.solver.open_clauses():
+            weight = 2.0 ** -len(clause)
+            for lit in clause:
+                scores[lit] = scores.get(lit, 0.0) + weight
+        if len(scores) == 0:
+            return self._first_unassigned()
+        return max(scores, key=scores.get)
+
+
+class VSIDS(Heuristic):
+    """Variable State Independent Decaying Sum: die Variable mit der
+    höchsten Aktivität, positiv zuerst.
+
+    Variablen aus Konflikten werden um `inc` erhöht; statt alle
+    Aktivitäten verfallen zu lassen, wächst `inc` nach jedem Konflikt
+    (EVSIDS). Die freien Variablen liegen in einem binären Max-Heap;
+    belegte Variablen werden erst beim Entnehmen verworfen und beim
+    Zurücknehmen ihrer Zuweisung wieder eingefügt.
+    """
+
+    def __init__(self, solver: Solver, decay: float = VSIDS_DECAY):
+        super().__init__(solver)
+        self.activity = [0.0] * (solver.num_vars + 1)
+        self.inc = 1.0
+        self.decay_factor = decay
+        # Alle Aktivitäten sind 0, die Variablenreihenfolge ist also ein Heap
+        self.heap = [v for v in range(1, solver.num_vars + 1)
+                     if solver.occurring[v]]
+        # position[v]: Index von v im Heap, -1 wenn nicht enthalten
+        self.position = [-1] * (solver.num_vars + 1)
+        for i, v in enumerate(self.heap):
+            self.position[v] = i
+
+    def _sift_up(self, i: int) -> None:
+        heap, position, activity = self.heap, self.position, self.activity
+        v = heap[i]
+        while i > 0:
+            parent = (i - 1) // 2
+            if activity[heap[parent]] >= activity[v]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i]] = i
+            i = parent
+        heap[i] = v
+        position[v] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap, position, activity = self.heap, self.position, self.activity
+        v = heap[i]
+        n = len(heap)
+        while 2 * i + 1 < n:
+            child = 2 * i + 1
+            if child + 1 < n and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= activity[v]:
+                break
+            heap[i] = heap[child]
+            position[heap[i]] = i
+            i = child
+        heap[i] = v
+        position[v] = i
+
+    def _pop(self) -> int:
+        heap = self.heap
+        v = heap[0]
+        last = heap.pop()
+        self.position[v] = -1
+        if len(heap) > 0:
+            heap[0] = last
+            self._sift_down(0)
+        return v
+
+    def choose(self) -> int:
+        value = self.solver.value
+        while len(self.heap) > 0:
+            v = self._pop()
+            if value[v] == UNASSIGNED:
                 return v
-    return 0  # Sollte nie passieren, wenn Formel nicht leer ist
-
-
-# DPLL Algorithmus - Hauptfunktion
-# Gibt zurück: (erfüllbar, assignment)
-def dpll(formula: Formula, assignment: Assignment) -> Tuple[bool, Assignment]:
-    # 1) Prüfe ob Formel bereits gelöst (leer = alle Klauseln erfüllt)
-    if _is_solved(formula):
-        return True, assignment
-    
-    # 2) Pure Literal Elimination
-    formula, assignment = _pure_literal_elimination(formula, assignment)
-    
-    # 3) Nach Pure Literal Elimination prüfen ob gelöst
-    if _is_solved(formula):
-        return True, assignment
-    
-    # 4) Unit Propagation
-    formula, assignment, conflict = _unit_propagate(formula, assignment)
-    if conflict:
-        return False, {}
-    
-    # 5) Nach Unit Propagation nochmal prüfen ob gelöst
-    if _is_solved(formula):
-        return True, assignment
-    
-    # 6) Wähle eine Variable zum Splitten
-    v = _choose_variable(formula, assignment)
-    
-    # 7) Split: Versuche v = True
-    new_assignment = dict(assignment)
-    new_assignment[v] = True
-    new_formula, conflict = _assign_literal(formula, v)
-    if not conflict:
-        sat, result_assignment = dpll(new_formula, new_assignment)
-        if sat:
-            return True, result_assignment
-    
-    # 8) Split: v = True hat nicht funktioniert, versuche v = False
-    new_assignment = dict(assignment)
-    new_assignment[v] = False
-    new_formula, conflict = _assign_literal(formula, neg(v))
-    if not conflict:
-        sat, result_assignment = dpll(new_formula, new_assignment)
-        if sat:
-            return True, result_assignment
-    
-    # 9) Beide Splits gescheitert --> UNSAT
-    return False, {}
-
-
-# Liest DIMACS CNF von einem String und gibt die Formel zurück
-def parse_dimacs(input_str: str) -> Formula:
-    formula: Formula = set()
-    
-    for line in input_str.split('\n'):
-        line = line.strip()
-        
-        # Leere Zeilen überspringen
-        if len(line) == 0:
-            continue
-        
-        # Kommentare überspringen (beginnen mit 'c')
-        if line[0] == 'c':
-            continue
-        
-        # Problem-Zeile überspringen (beginnt mit 'p')
-        if line[0] == 'p':
-            continue
-        
-        # Klausel einlesen
-        literals = []
-        parts = line.split()
-        for part in parts:
-            num = int(part)
-            if num == 0:
-                break  # Ende der Klausel
-            literals.append(num)
-        
-        if len(literals) > 0:
-            clause = frozenset(literals)
-            formula.add(clause)
-    
-    return formula
+        return 0
+
+    def unassigned(self, v: int) -> None:
+        if self.position[v] < 0:
+            self.heap.append(v)
+            self._sift_up(len(self.heap) - 1)
+
+    def bump(self, variables) -> None:
+        activity = self.activity
+        for v in variables:
+            activity[v] += self.inc
+            if activity[v] > 1e100:
+                # Überlauf vermeiden: alle Aktivitäten herunterskalieren
+                for u in range(len(activity)):
+                    activity[u] *= 1e-100
+                self.inc *= 1e-100
+            if self.position[v] >= 0:
+                self._sift_up(self.position[v])
+
+    def decay(self) -> None:
+        self.inc /= self.decay_factor
+
+
+HEURISTICS = {
+    "first": FirstUnassigned,
+    "dlis": DLIS,
+    "moms": MOMS,
+    "jw": JeroslowWang,
+    "vsids": VSIDS,
+}
+
+
+# Liest DIMACS CNF von einem String
+# Gibt (Anzahl Variablen, Klauseln) zurück
+# Kommentar- und Problem-Zeilen, werden vor dem Einlesen entfernt
+SKIPPED_LINES = re.compile(r"^[ \t]*[cp].*$", re.MULTILINE)
+PROBLEM_LINE = re.compile(r"^[ \t]*p[ \t]+cnf[ \t]+(\d+)", re.MULTILINE)
+# Manche Benchmarks (SATLIB) beenden die Formel mit '%'
+END_MARKER = re.compile(r"^[ \t]*%", re.MULTILINE)
+
+
+# Liest die ganze Eingabe auf einmal ein: Kommentare und Problem-Zeile
+# werden mit einem regulären Ausdruck entfernt, der Rest wird mit einem
+# split() in Zahlen zerlegt und an den Nullen in Klauseln geteilt. Eine
+# Klausel darf über mehrere Zeilen gehen, die letzte 0 darf fehlen.
+def parse_dimacs(input_str: str) -> Tuple[int, List[Clause]]:
+    end = END_MARKER.search(input_str)
+    if end:
+        input_str = input_str[:end.start()]
+
+    header = PROBLEM_LINE.search(input_str)
+    num_vars = int(header.group(1)) if header else 0
+
+    nums = list(map(int, SKIPPED_LINES.sub("", input_str).split()))
+    num_vars = max(num_vars, max(map(abs, nums), default=0))
+
+    clauses: List[Clause] = []
+    start = 0
+    for i, num in enumerate(nums):
+        if num == 0:
+            clauses.append(nums[start:i])  # Ende der Klausel
+            start = i + 1
+    if start < len(nums):
+        clauses.append(nums[start:])
+
+    return num_vars, clauses
+
+
+# Löst eine Formel im DIMACS-Format und gibt die Ausgabe als String zurück
+def solve(input_str: str, cdcl: bool = False, heuristic: str = "first",
+          phase_saving: bool = False, proof: Optional[TextIO] = None) -> str:
+    num_vars, clauses = parse_dimacs(input_str)
+
+    solver = Solver(num_vars, clauses, heuristic, phase_saving, proof)
+    sat, model = solver.solve(cdcl)
+    # Suchstatistik als Kommentarzeilen "c stat <Name> <Wert>"
+    stats = "".join(f"c stat {name} {value}\n"
+                    for name, value in solver.stats().items())
+
+    if sat:
+        # Ausgabe der Variablenbelegung
+        model_parts = [str(lit) for lit in model]
+        model_parts.append("0")
+        return "s SATISFIABLE\nv " + " ".join(model_parts) + "\n" + stats
+    return "s UNSATISFIABLE\n" + stats
 
 
 # Hauptprogramm - liest von stdin und führt DPLL aus
 def main():
+    parser = argparse.ArgumentParser(description="DPLL SAT-Solver")
+    parser.add_argument(
+        "--cdcl", action="store_true",
+        help="Klausellernen mit 1-UIP-Konfliktanalyse und Backjumping "
+             "(Standard: einfaches DPLL)")
+    parser.add_argument(
+        "--heuristic", choices=HEURISTICS, default="first",
+        help="Entscheidungsheuristik (Standard: first, die erste freie "
+             "Variable)")
+    parser.add_argument(
+        "--phase-saving", action="store_true",
+        help="Variablen bei einer neuen Entscheidung mit ihrem letzten Wert "
+             "belegen")
+    args = parser.parse_args()
+    options = (args.cdcl, args.heuristic, args.phase_saving)
+
+    # Persistenter Worker (ARENA_WORKER wird von batch.py gesetzt): jede
+    # Formel und jede Antwort ist ein Frame "<Länge in Bytes>\n<Inhalt>"
+    if os.environ.get("ARENA_WORKER"):
+        while header := sys.stdin.buffer.readline():
+            input_str = sys.stdin.buffer.read(int(header)).decode()
+            answer = solve(input_str, *options).encode()
+            sys.stdout.buffer.write(b"%d\n" % len(answer) + answer)
+            sys.stdout.buffer.flush()
+        return
+
     # Lese gesamte Eingabe von stdin
     input_str = sys.stdin.read()
-    formula = parse_dimacs(input_str)
-    
-    sat, assignment = dpll(formula, {})
-    
-    if sat:
-        print("s SATISFIABLE")
-        # Ausgabe der Variablenbelegung
-        model_parts = []
-        for v in sorted(assignment.keys()):
-            if assignment[v]:
-                model_parts.append(str(v))
-            else:
-                model_parts.append(str(neg(v)))
-        model_parts.append("0")
-        print("v " + " ".join(model_parts))
+    # ARENA_PROOF nennt die Datei für den Beweis. runner.py setzt es nur
+    # für eine ungemessene Wiederholung von UNSAT-Antworten (--check-proofs).
+    proof_path = os.environ.get("ARENA_PROOF")
+    if proof_path:
+        with open(proof_path, "w") as proof:
+            sys.stdout.write(solve(input_str, *options, proof))
     else:
-        print("s UNSATISFIABLE")
+        sys.stdout.write(solve(input_str, *options))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
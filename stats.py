@@ -0,0 +1,84 @@
+"""Statistical summaries over repeated benchmark trials."""
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+from analysis import solved_mask
+
+SUMMARY_METRICS = ["wall_sec", "cpu_sec", "memory_kb"]
+CONFIDENCE = 0.95
+
+
+def median_ci(values, confidence=CONFIDENCE):
+    """Distribution-free confidence interval for the median.
+
+    Uses the order statistics x_(k) and x_(n-k+1), with k the largest rank
+    for which the binomial tail P(B(n, 1/2) < k) stays below
+    (1 - confidence) / 2. For fewer than six trials no such k exists at
+    95 %, and the interval falls back to [min, max].
+    """
+    values = np.sort(np.asarray(values, dtype=float))
+    n = len(values)
+    alpha = (1 - confidence) / 2
+    k, tail = 0, 0.0
+    while k < n // 2:
+        tail += comb(n, k) / 2 ** n
+        if tail > alpha:
+            break
+        k += 1
+    k = max(k, 1)
+    return values[k - 1], values[n - k]
+
+
+def summarize_trials(df):
+    """Condenses per-trial rows into one row per (problem, solver).
+
+    For every metric in SUMMARY_METRICS the summary has the columns
+    <metric>_median, _q1, _q3, _iqr, _ci_low and _ci_high. The status is
+    the most frequent one over all trials, and a pair only counts as
+    correct if every trial was correct.
+    """
+    rows = []
+    for (problem, solver), trials in df.groupby(["problem", "solver"], sort=False):
+        row = {
+            "solver": solver,
+            "problem": problem,
+            "trials": len(trials),
+            "status": trials["status"].mode().iloc[0],
+            "correct": bool(trials["correct"].all()),
+        }
+        for metric in SUMMARY_METRICS:
+            values = trials[metric].to_numpy(dtype=float)
+            q1, median, q3 = np.percentile(values, [25, 50, 75])
+            ci_low, ci_high = median_ci(values)
+            row.update({
+                f"{metric}_median": median,
+                f"{metric}_q1": q1,
+                f"{metric}_q3": q3,
+                f"{metric}_iqr": q3 - q1,
+                f"{metric}_ci_low": ci_low,
+                f"{metric}_ci_high": ci_high,
+            })
+        rows.append(row)
+    return flag_ties(pd.DataFrame(rows))
+
+
+def flag_ties(summary, metric="wall_sec"):
+    """Marks solvers that are not significantly slower than the fastest.
+
+    Per problem, the fastest solver is the solver with the lowest median
+    among those that solved it. A solver that solved the problem is flagged
+    in `<metric>_tied` if its confidence interval overlaps the fastest
+    solver's interval, i.e. the difference between the two is not
+    significant. Timeouts, errors and wrong answers are never flagged.
+    """
+    solved = solved_mask(summary)
+    fastest = summary.loc[
+        summary[solved].groupby("problem")[f"{metric}_median"].idxmin(),
+        ["problem", f"{metric}_ci_high"]
+    ].rename(columns={f"{metric}_ci_high": "_best_ci_high"})
+    merged = summary.merge(fastest, on="problem", how="left")
+    summary[f"{metric}_tied"] = solved.to_numpy() & (
+        merged[f"{metric}_ci_low"] <= merged["_best_ci_high"]).to_numpy()
+    return summary
@@ -0,0 +1,269 @@
+"""SQLite store of all solver runs, used to resume benchmarks and to track
+solver performance across benchmark runs.
+
+Besides being used by the runner, the store can be queried from the
+command line:
+
+    python store.py history cadical.py uf50-011.cnf --last 50
+    python store.py runs
+    python store.py export results.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import datetime, timezone
+
+# A result is identified by what was measured, where and under which limits
+KEY_FIELDS = ("solver_hash", "problem_hash", "timeout_sec", "machine", "trial",
+              "memory_limit_mb")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    machine TEXT,
+    timeout_sec REAL,
+    git_revision TEXT,
+    options TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    solver TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    solver_hash TEXT NOT NULL,
+    problem_hash TEXT NOT NULL,
+    timeout_sec REAL NOT NULL,
+    machine TEXT NOT NULL,
+    trial INTEGER NOT NULL,
+    memory_limit_mb INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_key
+    ON results (solver_hash, problem_hash, timeout_sec, machine, trial);
+CREATE INDEX IF NOT EXISTS results_solver_problem
+    ON results (solver, problem, run_id);
+CREATE TABLE IF NOT EXISTS samples (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    t_sec REAL NOT NULL,
+    cpu_sec REAL NOT NULL,
+    rss_kb INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_result ON samples (result_id);
+"""
+
+
+def machine_id():
+    """Identifies the measuring machine across container restarts.
+
+    Container hostnames change on every `docker run`, so the id is derived
+    from the CPU model, the number of cores and the installed memory. Set
+    ARENA_MACHINE to override it.
+    """
+    if os.environ.get("ARENA_MACHINE"):
+        return os.environ["ARENA_MACHINE"]
+
+    cpu_model = mem_total = ""
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu_model = next((line.split(":", 1)[1].strip() for line in f
+                              if line.startswith("model name")), "")
+        with open("/proc/meminfo") as f:
+            mem_total = next((line.split(":", 1)[1].strip() for line in f
+                              if line.startswith("MemTotal")), "")
+    except OSError:
+        pass
+    fingerprint = f"{cpu_model}|{os.cpu_count()}|{mem_total}"
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+def git_revision():
+    """Returns the arena's git revision, or None outside a checkout.
+
+    Inside the Docker image there is no .git directory; the revision is
+    then taken from ARENA_GIT_REVISION, which is set at build time.
+    """
+    if os.environ.get("ARENA_GIT_REVISION"):
+        return os.environ["ARENA_GIT_REVISION"]
+    try:
+        res = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return res.stdout.strip() if res.returncode == 0 else None
+
+
+def run_key(row):
+    return tuple(row[field] for field in KEY_FIELDS)
+
+
+def sql_type(value):
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+class ResultStore:
+    """All measured results of all benchmark runs in one SQLite database.
+
+    Every result is committed as soon as its run finishes, so an
+    interrupted benchmark loses at most the runs that were in flight.
+    Result columns beyond the key are added to the table on first use, so
+    new metrics need no migration. If the same key was measured more than
+    once, get() returns the latest result.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+        self._columns = self._result_columns()
+        if "memory_limit_mb" not in self._columns:
+            # Stores from before memory limits; their runs had none
+            with self._db:
+                self._db.execute(
+                    "ALTER TABLE results ADD COLUMN memory_limit_mb INTEGER")
+            self._columns.add("memory_limit_mb")
+        self.run_id = None
+
+    def _result_columns(self):
+        return {row["name"] for row in self._db.execute(
+            "PRAGMA table_info(results)")}
+
+    def begin_run(self, timeout_sec, options=None):
+        """Records a new benchmark run; later results are attached to it."""
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO runs (started_at, host, machine, timeout_sec, "
+                "git_revision, options) VALUES (?, ?, ?, ?, ?, ?)",
+                (datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 socket.gethostname(), machine_id(), timeout_sec,
+                 git_revision(), json.dumps(options or {})))
+            self.run_id = cur.lastrowid
+        return self.run_id
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM results WHERE solver_hash = ? AND problem_hash = ? "
+                "AND timeout_sec = ? AND machine = ? AND trial = ? "
+                "AND COALESCE(memory_limit_mb, 0) = ? "
+                "ORDER BY id DESC LIMIT 1", key).fetchone()
+        if row is None:
+            return None
+        return {k: row[k] for k in row.keys()
+                if k not in ("id", "run_id") and row[k] is not None}
+
+    def append(self, row, samples=()):
+        """Adds a result, with its (t_sec, cpu_sec, rss_kb) resource
+        samples. Returns the result's id."""
+        # Missing values stay NULL; a column is typed by its first value
+        row = {k: v for k, v in row.items() if v is not None}
+        with self._lock, self._db:
+            for column, value in row.items():
+                if column not in self._columns:
+                    self._db.execute(
+                        f'ALTER TABLE results ADD COLUMN "{column}" {sql_type(value)}')
+                    self._columns.add(column)
+            columns = ", ".join(f'"{c}"' for c in ["run_id"] + list(row))
+            result_id = self._db.execute(
+                f"INSERT INTO results ({columns}) "
+                f"VALUES ({', '.join('?' * (len(row) + 1))})",
+                [self.run_id] + list(row.values())).lastrowid
+            self._db.executemany(
+                "INSERT INTO samples (result_id, t_sec, cpu_sec, rss_kb) "
+                "VALUES (?, ?, ?, ?)",
+                [(result_id, *sample) for sample in samples])
+        return result_id
+
+    def history(self, solver, problem, last=50):
+        """Results of a solver on a problem in the last `last` benchmark runs
+        that measured this pair, oldest first, with the run's metadata."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT runs.started_at, runs.git_revision, runs.host, results.* "
+                "FROM results JOIN runs ON runs.id = results.run_id "
+                "WHERE results.solver = ? AND results.problem = ? "
+                "AND results.run_id IN (SELECT DISTINCT run_id FROM results "
+                "  WHERE solver = ? AND problem = ? ORDER BY run_id DESC LIMIT ?) "
+                "ORDER BY results.id",
+                (solver, problem, solver, problem, last)).fetchall()
+        return [dict(row) for row in rows]
+
+    def timings(self, machine):
+        """Status and wall time of every measured trial on a machine."""
+        if not {"status", "wall_sec"} <= self._columns:
+            return []
+        with self._lock:
+            return [dict(row) for row in self._db.execute(
+                "SELECT solver_hash, problem_hash, status, wall_sec, timeout_sec "
+                "FROM results WHERE machine = ? AND trial > 0", (machine,))]
+
+    def runs(self):
+        with self._lock:
+            return [dict(row) for row in self._db.execute(
+                "SELECT runs.*, COUNT(results.id) AS results FROM runs "
+                "LEFT JOIN results ON results.run_id = runs.id "
+                "GROUP BY runs.id ORDER BY runs.id")]
+
+    def export_csv(self, file):
+        """Writes all results, joined with their run, as CSV."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT runs.started_at, runs.git_revision, runs.host, results.* "
+                "FROM results LEFT JOIN runs ON runs.id = results.run_id "
+                "ORDER BY results.id")
+            writer = csv.writer(file)
+            writer.writerow([d[0] for d in cur.description])
+            writer.writerows(cur)
+
+    def close(self):
+        self._db.close()
+
+
+def print_rows(rows):
+    writer = csv.writer(sys.stdout)
+    if rows:
+        writer.writerow(rows[0].keys())
+        writer.writerows(row.values() for row in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queries the result store.")
+    parser.add_argument("--db", default="/app/results/benchmark.db",
+                        help="path of the result database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    history = commands.add_parser(
+        "history", help="results of one solver on one problem over past runs")
+    history.add_argument("solver")
+    history.add_argument("problem")
+    history.add_argument("--last", type=int, default=50,
+                         help="number of most recent runs (default: 50)")
+    commands.add_parser("runs", help="list all benchmark runs")
+    export = commands.add_parser("export", help="export all results as CSV")
+    export.add_argument("file", nargs="?", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if args.command == "history":
+        print_rows(store.history(args.solver, args.problem, args.last))
+    elif args.command == "runs":
+        print_rows(store.runs())
+    elif args.file:
+        with open(args.file, "w", newline="") as f:
+            store.export_csv(f)
+    else:
+        store.export_csv(sys.stdout)
@@ -0,0 +1,178 @@
+"""Tests of the solver-independent parts of the arena and the Python solver.
+
+    python -m pytest test_arena.py
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import drat
+from arena import check_model, parse_output
+from dimacs import Formula, parse_dimacs, parse_dimacs_lines
+from store import KEY_FIELDS, ResultStore, run_key
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+T1_SOLVER = os.path.join(HERE, "solvers", "t1_david_mutas_dpll.py")
+UNSAT_CNF = b"p cnf 4 6\n1 2 0\n-1 2 0\n1 -2 0\n-1 -2 0\n3 4 0\n-3 4 0\n"
+T1_OPTIONS = [[], ["--cdcl"], ["--heuristic", "vsids"], ["--heuristic", "dlis"],
+              ["--cdcl", "--heuristic", "moms", "--phase-saving"]]
+
+
+@pytest.mark.parametrize("cnf", [
+    b"c comment\np cnf 3 2\n1 -2 0\n2 3\n-1 0\n",
+    b"p cnf 2 2\n1 2 0\n-1 -2\n",
+    b"p cnf 2 1\n1 2 0\n%\n0\n",
+    b"p cnf 2 0\n",
+])
+def test_parse_dimacs_matches_line_parser(cnf):
+    num_vars, literals, offsets = parse_dimacs(cnf)
+    expected = parse_dimacs_lines(cnf.decode().splitlines())
+    assert num_vars == expected[0]
+    assert literals.dtype == np.int32
+    assert literals.tolist() == expected[1].tolist()
+    assert offsets.tolist() == expected[2].tolist()
+
+
+@pytest.mark.parametrize("cnf", [
+    b"p cnf 2 1\n1 x 2 0\n",
+    b"p cnf 2 1\n1 2x 0\n",
+    b"p cnf 2 1\n1.5 2 0\n",
+])
+def test_parse_dimacs_rejects_malformed_input(cnf):
+    with pytest.raises(ValueError, match="invalid literal in DIMACS input"):
+        parse_dimacs(cnf)
+
+
+@pytest.mark.parametrize("cnf", [
+    b"p cnf 2 1\n1 3 0\n",
+    b"p cnf 2 1\n-3 1 0\n",
+    b"p cnf 2 1\n4294967297 0\n",
+    b"p cnf 2 1\n99999999999999999999 0\n",
+    b"p cnf 2 1\n-99999999999999999999 0\n",
+])
+def test_parse_dimacs_rejects_literals_out_of_range(cnf):
+    with pytest.raises(ValueError, match="exceeds declared 2 variables"):
+        parse_dimacs(cnf)
+
+
+def test_formula_checks_models():
+    formula = Formula.from_bytes(b"p cnf 3 3\n1 2 0\n-1 3 0\n-2 -3 0\n")
+    assert formula.num_clauses == 3
+    assert formula.clause(1) == [-1, 3]
+    assert formula.falsified_clauses([1, -2, 3]).tolist() == []
+    assert formula.falsified_clauses([1, 2, 3]).tolist() == [2]
+    # Unassigned variables satisfy nothing
+    assert formula.falsified_clauses([-1]).tolist() == [0, 2]
+    assert check_model(formula, "SAT", [1, 2, 3]) == \
+        (False, "Invalid Model (Clause [-2, -3] failed)")
+    assert check_model(formula, "UNSAT", [1, 2, 3]) == \
+        (True, "UNSAT (given countermodel verified)")
+
+
+@pytest.fixture
+def python_checker(monkeypatch):
+    monkeypatch.setattr(drat, "DRAT_TRIM", None)
+
+
+@pytest.mark.parametrize("proof", [
+    b"2 0\n0\n",
+    b"c RUP lemma, deletion, empty clause\n2 0\nd 3 4 0\n0\n",
+    b"a\x04\x00a\x00",  # binary format of "2 0 / 0"
+])
+def test_check_proof_accepts_valid_proof(python_checker, proof):
+    stats = drat.check_proof(Formula.from_bytes(UNSAT_CNF), proof)
+    assert stats["checker"] == "python"
+    assert stats["core_lemmas"] >= 1
+
+
+@pytest.mark.parametrize("proof, reason", [
+    (b"-4 0\n0\n", "is neither RUP nor RAT"),
+    (b"3 0\n", "does not derive the empty clause"),
+    (b"0\n", "the empty clause does not follow"),
+    (b"2 x 0\n0\n", "invalid token"),
+])
+def test_check_proof_rejects_corrupted_proof(python_checker, proof, reason):
+    with pytest.raises(drat.ProofError, match=reason):
+        drat.check_proof(Formula.from_bytes(UNSAT_CNF), proof)
+
+
+def result_key(**changes):
+    key = dict(zip(KEY_FIELDS, ("solver", "problem", 30.0, "machine", 1,
+                                4096)))
+    return {**key, **changes}
+
+
+def test_store_resumes_latest_result_under_the_same_limits(tmp_path):
+    store = ResultStore(str(tmp_path / "benchmark.db"))
+    store.begin_run(30.0)
+    key = result_key()
+    assert store.get(run_key(key)) is None
+    store.append({**key, "solver": "s.py", "problem": "p.cnf",
+                  "status": "SAT", "wall_sec": 1.5})
+    store.append({**key, "solver": "s.py", "problem": "p.cnf",
+                  "status": "UNSAT", "wall_sec": 2.5}, [(0.1, 0.1, 1000)])
+    assert store.get(run_key(key))["status"] == "UNSAT"
+    for changes in ({"trial": 2}, {"timeout_sec": 60.0},
+                    {"memory_limit_mb": 0}, {"machine": "other"}):
+        assert store.get(run_key(result_key(**changes))) is None
+    store.close()
+
+
+def test_store_migrates_results_without_memory_limit(tmp_path):
+    path = str(tmp_path / "benchmark.db")
+    db = sqlite3.connect(path)
+    db.executescript(
+        "CREATE TABLE results (id INTEGER PRIMARY KEY, run_id INTEGER, "
+        "solver TEXT, problem TEXT, solver_hash TEXT, problem_hash TEXT, "
+        "timeout_sec REAL, machine TEXT, trial INTEGER, status TEXT);"
+        "INSERT INTO results VALUES (1, 1, 's.py', 'p.cnf', 'solver', "
+        "'problem', 30.0, 'machine', 1, 'SAT');")
+    db.close()
+
+    store = ResultStore(path)
+    # Older runs had no memory limit
+    assert store.get(run_key(result_key(memory_limit_mb=0)))["status"] == "SAT"
+    assert store.get(run_key(result_key())) is None
+    store.close()
+
+
+def run_t1(cnf, options, env=None):
+    res = subprocess.run([sys.executable, T1_SOLVER] + options, input=cnf,
+                         capture_output=True, check=True, env=env)
+    return parse_output(res.stdout.decode(), res.returncode, False)
+
+
+@pytest.mark.parametrize("options", T1_OPTIONS)
+def test_check_proof_accepts_t1_proof(python_checker, tmp_path, options):
+    cnf = open(os.path.join(HERE, "problems", "uuf50-010.cnf"), "rb").read()
+    proof_path = tmp_path / "proof.drat"
+    status, _ = run_t1(cnf, options,
+                       {**os.environ, drat.PROOF_ENV: str(proof_path)})
+    assert status == "UNSAT"
+    formula = Formula.from_bytes(cnf)
+    drat.check_proof(formula, proof_path.read_bytes())
+
+    # Without its last lemmas the proof no longer refutes the formula
+    lines = proof_path.read_bytes().splitlines()
+    with pytest.raises(drat.ProofError):
+        drat.check_proof(formula, b"\n".join(lines[:len(lines) // 2]))
+
+
+@pytest.mark.parametrize("options", T1_OPTIONS)
+@pytest.mark.parametrize("cnf", [
+    b"p cnf 1 1\n-1 1 0\n",
+    b"p cnf 2 2\n-1 1 0\n2 0\n",
+    b"p cnf 3 3\n1 -2 2 0\n-1 3 0\n3 -3 1 0\n",
+])
+def test_t1_assigns_variables_of_tautologies(cnf, options):
+    formula = Formula.from_bytes(cnf)
+    status, model = run_t1(cnf, options)
+    assert status == "SAT"
+    assert sorted(abs(lit) for lit in model) == \
+        list(range(1, formula.num_vars + 1))
+    assert check_model(formula, status, model) == \
+        (True, "SAT (given model verified)")
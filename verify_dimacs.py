@@ -1,27 +1,17 @@
 import sys
 
-input_data = sys.stdin.read()
+from dimacs import DimacsError, check_dimacs
 
 
 def verify_dimacs() -> bool:
-    literals = set()
-    nbvars = 0
-    for line in input_data.splitlines():
-        line = line.strip()
-        if line.startswith("c"):
-            continue
-        elif line.startswith("p"):
-            nbvars = int(line.split()[2])
-        else:
-            literals = literals.union(
-                {abs(int(l)) for l in line.split()[:-1]})
-    if all(l > 0 for l in literals) and all(l in literals for l in range(1, nbvars+1)):
-        print("verified!")
-        return True
-    else:
-        print("could not be verified!")
+    try:
+        check_dimacs(sys.stdin)
+    except DimacsError as e:
+        print(f"could not be verified! ({e})")
         return False
+    print("verified!")
+    return True
 
 
 if __name__ == "__main__":
-    verify_dimacs()
+    sys.exit(0 if verify_dimacs() else 1)